@@ -0,0 +1,33 @@
+"""users listing indexes (role + id, username prefix)
+
+Revision ID: 3e9b57d0c2f1
+Revises: a6d19c4e7b52
+Create Date: 2026-10-17 16:40:07.215904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9b57d0c2f1'
+down_revision: Union[str, Sequence[str], None] = 'a6d19c4e7b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_role_id', 'users', ['role', 'id'], unique=False)
+    op.create_index(
+        'ix_users_username_prefix', 'users', ['username'], unique=False,
+        postgresql_ops={'username': 'varchar_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_prefix', table_name='users')
+    op.drop_index('ix_users_role_id', table_name='users')
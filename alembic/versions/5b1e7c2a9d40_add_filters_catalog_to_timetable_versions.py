@@ -0,0 +1,54 @@
+"""add filters_catalog to timetable_versions
+
+Revision ID: 5b1e7c2a9d40
+Revises: 0973ddd156c0
+Create Date: 2026-10-17 09:12:41.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2a9d40'
+down_revision: Union[str, Sequence[str], None] = '0973ddd156c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# mesmas listas de app.services.timetable_import.build_filters_catalog
+_CATALOG_FIELDS = (
+    ("class_codes", "class_code"),
+    ("courses", "course_name"),
+    ("teachers", "teacher_name"),
+    ("rooms", "room_name"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('timetable_versions', sa.Column('filters_catalog', sa.JSON(), nullable=True))
+
+    # backfill: o GET /filters só lê o catálogo (sem ele, calcula e não grava)
+    bind = op.get_bind()
+    columns = ", ".join(column for _, column in _CATALOG_FIELDS)
+    update = sa.text(
+        "UPDATE timetable_versions SET filters_catalog = :catalog WHERE id = :id"
+    ).bindparams(sa.bindparam("catalog", type_=sa.JSON))
+    for version_id in bind.execute(sa.text("SELECT id FROM timetable_versions")).scalars().all():
+        sets = {key: set() for key, _ in _CATALOG_FIELDS}
+        rows = bind.execute(
+            sa.text(f"SELECT DISTINCT {columns} FROM timetable_entries WHERE timetable_version_id = :id"),
+            {"id": version_id},
+        )
+        for row in rows:
+            for (key, _), value in zip(_CATALOG_FIELDS, row):
+                if value and value.strip():
+                    sets[key].add(value)
+        bind.execute(update, {"catalog": {key: sorted(values) for key, values in sets.items()}, "id": version_id})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('timetable_versions', 'filters_catalog')
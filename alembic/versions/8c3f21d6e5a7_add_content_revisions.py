@@ -0,0 +1,83 @@
+"""add content revisions (timetable_versions.revision + data_revisions)
+
+Revision ID: 8c3f21d6e5a7
+Revises: 5b1e7c2a9d40
+Create Date: 2026-10-17 10:03:55.618230
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f21d6e5a7'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c2a9d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_MOD = 1 << 256
+
+
+def _revision(rows) -> str:
+    # mesma regra de app.core.etag.RevisionHasher (soma dos sha256, independe da ordem)
+    acc = count = 0
+    for row in rows:
+        raw = json.dumps(list(row), separators=(",", ":"), ensure_ascii=False, default=str)
+        acc = (acc + int.from_bytes(hashlib.sha256(raw.encode("utf-8")).digest(), "big")) % _MOD
+        count += 1
+    h = hashlib.sha256(acc.to_bytes(32, "big"))
+    h.update(str(count).encode("ascii"))
+    return h.hexdigest()
+
+
+# colunas de app.services.timetable_import.ENTRY_COLUMNS
+_ENTRY_COLUMNS = (
+    "weekday", "slot", "group_code", "class_code", "course_name",
+    "subject_code", "subject_name", "teacher_username", "teacher_name",
+    "room_code", "room_name",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('timetable_versions', sa.Column('revision', sa.String(length=64), nullable=True))
+    op.create_table('data_revisions',
+    sa.Column('scope', sa.String(length=40), nullable=False),
+    sa.Column('revision', sa.String(length=64), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+
+    # backfill: os GETs só leem a revisão (calculam sem gravar se faltar)
+    bind = op.get_bind()
+    version_ids = bind.execute(sa.text("SELECT id FROM timetable_versions")).scalars().all()
+    for version_id in version_ids:
+        rows = bind.execute(
+            sa.text(f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM timetable_entries WHERE timetable_version_id = :id"),
+            {"id": version_id},
+        )
+        bind.execute(
+            sa.text("UPDATE timetable_versions SET revision = :rev WHERE id = :id"),
+            {"rev": _revision(rows), "id": version_id},
+        )
+
+    scopes = {
+        # escopos e colunas de routes/timetable.py (_versions_revision) e routes/calendar.py (_calendar_revision)
+        "timetable_versions": "SELECT id, code, start_date, end_date, source, note FROM timetable_versions",
+        "calendar": "SELECT day, is_school_day, kind, note FROM calendar_days",
+    }
+    for scope, query in scopes.items():
+        bind.execute(
+            sa.text("INSERT INTO data_revisions (scope, revision) VALUES (:scope, :rev)"),
+            {"scope": scope, "rev": _revision(bind.execute(sa.text(query)))},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_revisions')
+    op.drop_column('timetable_versions', 'revision')
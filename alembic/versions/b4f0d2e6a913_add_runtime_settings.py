@@ -0,0 +1,33 @@
+"""add runtime_settings
+
+Revision ID: b4f0d2e6a913
+Revises: 3e9b57d0c2f1
+Create Date: 2026-10-17 19:04:12.552310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f0d2e6a913'
+down_revision: Union[str, Sequence[str], None] = '3e9b57d0c2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('runtime_settings',
+    sa.Column('key', sa.String(length=40), nullable=False),
+    sa.Column('value', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('runtime_settings')
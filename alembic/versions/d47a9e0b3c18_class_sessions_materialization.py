@@ -0,0 +1,86 @@
+"""class_sessions: link to timetable version + widen fields to match entries
+
+Revision ID: d47a9e0b3c18
+Revises: 8c3f21d6e5a7
+Create Date: 2026-10-17 11:48:09.331502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd47a9e0b3c18'
+down_revision: Union[str, Sequence[str], None] = '8c3f21d6e5a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('class_sessions', sa.Column('timetable_version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_class_sessions_timetable_version_id', 'class_sessions', 'timetable_versions',
+        ['timetable_version_id'], ['id'], ondelete='CASCADE',
+    )
+    op.add_column('class_sessions', sa.Column('class_code', sa.String(length=20), nullable=True))
+    op.create_index(op.f('ix_class_sessions_class_code'), 'class_sessions', ['class_code'], unique=False)
+    op.create_index('ix_class_sessions_version_day', 'class_sessions', ['timetable_version_id', 'day'], unique=False)
+
+    # mesmo formato de timetable_entries (slot "07:30-08:20", group_code bruto do FET)
+    op.alter_column('class_sessions', 'slot',
+               existing_type=sa.SmallInteger(),
+               type_=sa.String(length=20),
+               postgresql_using='slot::text',
+               existing_nullable=False)
+    op.alter_column('class_sessions', 'group_code',
+               existing_type=sa.String(length=50),
+               type_=sa.String(length=200),
+               existing_nullable=False)
+    op.alter_column('class_sessions', 'subject_code',
+               existing_type=sa.String(length=50),
+               type_=sa.String(length=120),
+               existing_nullable=False)
+    op.alter_column('class_sessions', 'teacher_username',
+               existing_type=sa.String(length=50),
+               type_=sa.String(length=120),
+               existing_nullable=True)
+    op.alter_column('class_sessions', 'room_code',
+               existing_type=sa.String(length=50),
+               type_=sa.String(length=120),
+               existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # aulas geradas do horário têm slot "HH:MM-HH:MM", que não volta para smallint
+    op.execute("DELETE FROM class_sessions WHERE timetable_version_id IS NOT NULL")
+
+    op.alter_column('class_sessions', 'room_code',
+               existing_type=sa.String(length=120),
+               type_=sa.String(length=50),
+               existing_nullable=True)
+    op.alter_column('class_sessions', 'teacher_username',
+               existing_type=sa.String(length=120),
+               type_=sa.String(length=50),
+               existing_nullable=True)
+    op.alter_column('class_sessions', 'subject_code',
+               existing_type=sa.String(length=120),
+               type_=sa.String(length=50),
+               existing_nullable=False)
+    op.alter_column('class_sessions', 'group_code',
+               existing_type=sa.String(length=200),
+               type_=sa.String(length=50),
+               existing_nullable=False)
+    op.alter_column('class_sessions', 'slot',
+               existing_type=sa.String(length=20),
+               type_=sa.SmallInteger(),
+               postgresql_using='slot::smallint',
+               existing_nullable=False)
+    op.drop_index('ix_class_sessions_version_day', table_name='class_sessions')
+    op.drop_index(op.f('ix_class_sessions_class_code'), table_name='class_sessions')
+    op.drop_column('class_sessions', 'class_code')
+    op.drop_constraint('fk_class_sessions_timetable_version_id', 'class_sessions', type_='foreignkey')
+    op.drop_column('class_sessions', 'timetable_version_id')
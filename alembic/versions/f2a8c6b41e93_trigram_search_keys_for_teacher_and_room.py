@@ -0,0 +1,61 @@
+"""trigram search keys for teacher and room
+
+Revision ID: f2a8c6b41e93
+Revises: d47a9e0b3c18
+Create Date: 2026-10-17 13:26:50.871344
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8c6b41e93'
+down_revision: Union[str, Sequence[str], None] = 'd47a9e0b3c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _search_key(text):
+    # mesma regra de app.services.timetable_import.search_key
+    if not text:
+        return None
+    s = unicodedata.normalize("NFKD", str(text))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.casefold().split()) or None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('timetable_entries', sa.Column('teacher_search', sa.String(length=120), nullable=True))
+    op.add_column('timetable_entries', sa.Column('room_search', sa.String(length=120), nullable=True))
+
+    # backfill: nomes distintos são poucos, então um UPDATE por nome basta
+    bind = op.get_bind()
+    for column, source in (("teacher_search", "teacher_name"), ("room_search", "room_name")):
+        names = bind.execute(
+            sa.text(f"SELECT DISTINCT {source} FROM timetable_entries WHERE {source} IS NOT NULL")
+        ).scalars().all()
+        if names:
+            bind.execute(
+                sa.text(f"UPDATE timetable_entries SET {column} = :key WHERE {source} = :name"),
+                [{"key": _search_key(n), "name": n} for n in names],
+            )
+
+    op.create_index('ix_timetable_entries_teacher_search_trgm', 'timetable_entries', ['teacher_search'],
+                    unique=False, postgresql_using='gin', postgresql_ops={'teacher_search': 'gin_trgm_ops'})
+    op.create_index('ix_timetable_entries_room_search_trgm', 'timetable_entries', ['room_search'],
+                    unique=False, postgresql_using='gin', postgresql_ops={'room_search': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_timetable_entries_room_search_trgm', table_name='timetable_entries')
+    op.drop_index('ix_timetable_entries_teacher_search_trgm', table_name='timetable_entries')
+    op.drop_column('timetable_entries', 'room_search')
+    op.drop_column('timetable_entries', 'teacher_search')
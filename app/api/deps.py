@@ -1,19 +1,32 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.core.security import verify
-from app.core.config import settings
+from app.core.tokens import key_reloader, token_verifier
+from app.services.token_revocations import refresh_revocations
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
-def get_current_user(
+async def refresh_signing_keys() -> None:
+    """Rotação de chaves: .env alterado é relido (AUTH_KEYS_REFRESH_SECONDS). Login e verify chamam."""
+    if key_reloader.claim_check():
+        await run_in_threadpool(key_reloader.reload_if_changed)
+
+# async: só CPU (HMAC), sem IO; evita um salto pro threadpool a cada request
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
 ):
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing bearer token")
 
-    payload = verify(credentials.credentials, settings.AUTH_SECRET)
+    # revogações feitas em outros workers chegam aqui a cada AUTH_REVOCATION_REFRESH_SECONDS
+    if token_verifier.revocations.claim_refresh():
+        await run_in_threadpool(refresh_revocations, token_verifier.revocations)
+
+    await refresh_signing_keys()
+
+    payload = token_verifier.verify(credentials.credentials)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid or expired token")
 
-    return payload
\ No newline at end of file
+    return payload
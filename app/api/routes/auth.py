@@ -1,28 +1,55 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from app.db.session import get_db
+from app.api.deps import bearer_scheme, get_current_user, refresh_signing_keys
+from app.db.session import AnySession, get_session, run_db
 from app.models.user import User
-from app.schemas.auth import LoginIn, LoginOut
-from app.core.security import sign
-from app.core.config import settings
+from app.schemas.auth import LoginIn, LoginOut, RevokeIn
+from app.core.tokens import key_reloader, token_digest, token_id, token_verifier
+from app.services.token_revocations import revoke_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-def _secret() -> str:
-    return settings.AUTH_SECRET
+def _find_user(db: Session, username: str) -> User | None:
+    return db.execute(select(User).where(User.username == username)).scalar_one_or_none()
 
 @router.post("/login", response_model=LoginOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    user = db.execute(select(User).where(User.username == payload.username)).scalar_one_or_none()
+async def login(payload: LoginIn, db: AnySession = Depends(get_session)):
+    user = await run_db(db, _find_user, payload.username)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid credentials")
 
-    token = sign(
+    # assina com a chave atual (AUTH_KEY_ID) ou no formato antigo, sem kid; relê antes
+    # para um worker que só atende login não seguir com o kid anterior à rotação
+    await refresh_signing_keys()
+    token = token_verifier.sign(
         {"sub": user.username, "role": user.role},
-        secret=_secret(),
         ttl_seconds=60 * 60 * 24 * 7,  # 7 dias
     )
-    return LoginOut(access_token=token)
\ No newline at end of file
+    return LoginOut(access_token=token)
+
+async def _revoke(db: AnySession, token: str) -> dict:
+    payload = token_verifier.verify(token)
+    if not payload:
+        raise HTTPException(status_code=400, detail="invalid or expired token")
+    tid = token_id(payload, token_digest(token))
+    await run_db(db, revoke_token, token_verifier.revocations, tid, int(payload["exp"]))
+    return {"ok": True, "token_id": tid}
+
+@router.post("/logout", dependencies=[Depends(get_current_user)])
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AnySession = Depends(get_session),
+):
+    return await _revoke(db, credentials.credentials)
+
+@router.post("/revoke", dependencies=[Depends(get_current_user)])
+async def revoke(payload: RevokeIn, db: AnySession = Depends(get_session)):
+    return await _revoke(db, payload.token)
+
+@router.get("/cache/stats", dependencies=[Depends(get_current_user)])
+async def token_cache_stats():
+    return {**token_verifier.stats(), "key_reloads": key_reloader.reloads}
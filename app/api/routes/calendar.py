@@ -1,52 +1,263 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import or_, select
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.bulk import upsert_insert
+from app.db.session import AnySession, get_db, get_session, run_db
+from app.db.revisions import get_revision, set_revision
+from app.core.etag import (
+    ETAG_HEADERS,
+    NOT_MODIFIED,
+    RevisionHasher,
+    chain_revision,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_etag,
+)
+from app.core.responses import FastJSONResponse
 from app.models.calendar_day import CalendarDay
 from app.schemas.calendar import CalendarDayIn, CalendarDayOut
+from app.services.calendar_index import CalendarIndex, calendar_index
+from app.services.class_sessions import materialize_calendar_changes
 from app.api.deps import get_current_user
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
+CALENDAR_SCOPE = "calendar"
+
+# GET /calendar devolve no máximo isso por página (um ano letivo cabe numa)
+DEFAULT_PAGE_SIZE = 366
+MAX_PAGE_SIZE = 1000
+
+
+def _calendar_revision(db: Session) -> str:
+    hasher = RevisionHasher()
+    for row in db.execute(
+        select(CalendarDay.day, CalendarDay.is_school_day, CalendarDay.kind, CalendarDay.note)
+    ).all():
+        hasher.add(row)
+    return hasher.hexdigest()
+
 
 @router.post("/import", response_model=list[CalendarDayOut])
-def import_calendar(
+async def import_calendar(
     payload: list[CalendarDayIn],
+    # Session síncrona mesmo com DB_ASYNC: upsert + materialize em lote no threadpool
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    created = []
-
-    for item in payload:
-        exists = db.execute(
-            select(CalendarDay).where(CalendarDay.day == item.day)
-        ).scalar_one_or_none()
-
-        if exists:
-            exists.is_school_day = item.is_school_day
-            exists.kind = item.kind
-            exists.note = item.note
-            created.append(exists)
-        else:
-            day = CalendarDay(
-                day=item.day,
-                is_school_day=item.is_school_day,
-                kind=item.kind,
-                note=item.note,
-            )
-            db.add(day)
-            created.append(day)
+    return await run_db(db, _import_calendar, payload)
+
+
+def _import_calendar(db: Session, payload: list[CalendarDayIn]):
+    # ON CONFLICT não aceita o mesmo dia duas vezes no mesmo comando: o último vence
+    rows = {
+        item.day: {
+            "day": item.day,
+            "is_school_day": item.is_school_day,
+            "kind": item.kind,
+            "note": item.note,
+        }
+        for item in payload
+    }
+    if not rows:
+        return []
+
+    # upsert em lote; o WHERE faz o RETURNING trazer só os dias que mudaram
+    stmt = upsert_insert(db, CalendarDay)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CalendarDay.day],
+        set_={
+            "is_school_day": stmt.excluded.is_school_day,
+            "kind": stmt.excluded.kind,
+            "note": stmt.excluded.note,
+        },
+        where=or_(
+            CalendarDay.is_school_day.is_distinct_from(stmt.excluded.is_school_day),
+            CalendarDay.kind.is_distinct_from(stmt.excluded.kind),
+            CalendarDay.note.is_distinct_from(stmt.excluded.note),
+        ),
+    ).returning(CalendarDay.day, CalendarDay.is_school_day, CalendarDay.kind, CalendarDay.note)
+
+    changes = RevisionHasher()
+    changed_days = []
+    for changed in db.execute(stmt, list(rows.values())).all():
+        changes.add(changed)
+        changed_days.append(changed.day)
+
+    if changes.count:
+        previous = get_revision(db, CALENDAR_SCOPE)
+        set_revision(db, CALENDAR_SCOPE, chain_revision(previous, changes.hexdigest()))
+        if settings.SESSIONS_AUTO_MATERIALIZE:
+            materialize_calendar_changes(db, changed_days)
 
     db.commit()
-    return created
+    if changes.count:
+        calendar_index.invalidate()
+
+    return db.execute(
+        select(CalendarDay).where(CalendarDay.day.in_(list(rows))).order_by(CalendarDay.day)
+    ).scalars().all()
+
+
+# sem response_model: o corpo já sai serializado (FastJSONResponse) ou é um 304
+@router.get(
+    "",
+    response_class=FastJSONResponse,
+    responses={
+        200: {
+            "model": list[CalendarDayOut],
+            "headers": {
+                **ETAG_HEADERS,
+                "X-Next-After": {"description": "Cursor da próxima página (só se houver mais)", "schema": {"type": "string"}},
+                "Link": {"description": 'rel="next" com o after preenchido', "schema": {"type": "string"}},
+            },
+        },
+        **NOT_MODIFIED,
+    },
+)
+async def list_calendar(
+    request: Request,
+    date_from: date | None = Query(None, alias="from", description="Primeiro dia (inclusive)"),
+    date_to: date | None = Query(None, alias="to", description="Último dia (inclusive)"),
+    is_school_day: bool | None = Query(None),
+    kind: str | None = Query(None, max_length=30, description="Ex: FERIADO | AULA_NORMAL"),
+    after: date | None = Query(None, description="Cursor: devolve dias > after (ver header X-Next-After)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    filters = (date_from, date_to, is_school_day, kind, after, limit)
+    return await run_db(db, _list_calendar, request, filters, if_none_match)
+
+
+def _list_calendar(db: Session, request: Request, filters: tuple, if_none_match: str | None):
+    date_from, date_to, is_school_day, kind, after, limit = filters
+    revision = get_revision(db, CALENDAR_SCOPE, compute=lambda: _calendar_revision(db))
+    etag = make_etag(revision, date_from, date_to, is_school_day, kind, after, limit)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # keyset em "day" (ix_calendar_days_day): custo depende do limit, não do tamanho da tabela
+    q = select(CalendarDay.id, CalendarDay.day, CalendarDay.is_school_day, CalendarDay.kind, CalendarDay.note)
+    if date_from:
+        q = q.where(CalendarDay.day >= date_from)
+    if date_to:
+        q = q.where(CalendarDay.day <= date_to)
+    if after:
+        q = q.where(CalendarDay.day > after)
+    if is_school_day is not None:
+        q = q.where(CalendarDay.is_school_day == is_school_day)
+    if kind:
+        q = q.where(CalendarDay.kind == kind)
+
+    # tuplas -> JSON direto (mesmo formato de CalendarDayOut, sem hidratar ORM)
+    days = [row._asdict() for row in db.execute(q.order_by(CalendarDay.day).limit(limit + 1))]
+
+    next_after = None
+    if len(days) > limit:
+        days = days[:limit]
+        next_after = days[-1]["day"].isoformat()
+
+    response = FastJSONResponse(days)
+    set_etag(response, etag)
+    if next_after:
+        response.headers["X-Next-After"] = next_after
+        response.headers["Link"] = f'<{request.url.include_query_params(after=next_after)}>; rel="next"'
+    return response
+
+
+# ----------------------------
+# Dias letivos (índice em memória)
+# ----------------------------
+
+# Session síncrona mesmo com DB_ASYNC: montar o índice (tabela inteira) é CPU e
+# não pode rodar no run_sync, na thread do event loop; com o índice pronto, o
+# threadpool só paga a consulta da revisão
 
+def _index(db: Session) -> CalendarIndex:
+    revision = get_revision(db, CALENDAR_SCOPE, compute=lambda: _calendar_revision(db))
+    return calendar_index.get(db, revision)
 
-@router.get("", response_model=list[CalendarDayOut])
-def list_calendar(
+
+def _iso(d: date | None) -> str | None:
+    return d.isoformat() if d else None
+
+
+@router.get("/school-days/terms")
+async def school_day_terms(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    return db.execute(
-        select(CalendarDay).order_by(CalendarDay.day)
-    ).scalars().all()
\ No newline at end of file
+    idx = await run_db(db, _index)
+    return [
+        {
+            "term": term,
+            "start": first.isoformat(),
+            "end": last.isoformat(),
+            "school_days": idx.count_between(first, last),
+        }
+        for term, (first, last) in sorted(idx.terms.items(), key=lambda t: t[1][0])
+    ]
+
+
+@router.get("/school-days/check")
+async def check_school_day(
+    day: date,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    return {"day": day.isoformat(), "is_school_day": (await run_db(db, _index)).is_school_day(day)}
+
+
+@router.get("/school-days/count")
+async def count_school_days(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    return {
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "school_days": (await run_db(db, _index)).count_between(date_from, date_to),
+    }
+
+
+@router.get("/school-days/nth")
+async def nth_school_day(
+    n: int = Query(..., ge=1),
+    term: str | None = Query(None, description="Ex: SEMESTRE_II"),
+    date_from: date | None = Query(None, alias="from", description="Conta a partir deste dia (inclusive)"),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    idx = await run_db(db, _index)
+    if term:
+        if term not in idx.terms:
+            raise HTTPException(status_code=404, detail="term not found")
+        day = idx.nth_school_day_of_term(n, term)
+    else:
+        day = idx.nth_school_day(n, date_from)
+
+    if day is None:
+        raise HTTPException(status_code=404, detail="out of calendar range")
+    return {"n": n, "term": term, "from": _iso(date_from), "day": day.isoformat()}
+
+
+@router.get("/school-days/add")
+async def add_school_days(
+    day: date,
+    n: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    result = (await run_db(db, _index)).add_school_days(day, n)
+    if result is None:
+        raise HTTPException(status_code=404, detail="out of calendar range")
+    return {"day": day.isoformat(), "n": n, "result": result.isoformat()}
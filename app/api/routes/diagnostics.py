@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user
+from app.db.session import diagnostics, get_db
+from app.schemas.diagnostics import DbDiagnosticsIn, DbDiagnosticsOut
+from app.services.db_diagnostics import save_diagnostics
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+
+# os contadores (e o pid) são do worker que respondeu
+@router.get("/db", response_model=DbDiagnosticsOut, dependencies=[Depends(get_current_user)])
+async def get_db_diagnostics():
+    return diagnostics.status()
+
+
+# gravado em runtime_settings: aplicado já neste worker e nos outros em até
+# DB_DIAGNOSTICS_REFRESH_SECONDS
+@router.put("/db", response_model=DbDiagnosticsOut, dependencies=[Depends(get_current_user)])
+def update_db_diagnostics(payload: DbDiagnosticsIn, db: Session = Depends(get_db)):
+    return save_diagnostics(db, diagnostics, payload.model_dump())
@@ -1,68 +1,126 @@
 # app/api/routes/timetable.py
 from __future__ import annotations
 
-import re
+import csv
+import io
+import tempfile
+import zlib
 from datetime import date
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import delete, func, select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, undefer
 
 from app.api.deps import get_current_user
-from app.db.session import get_db
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.etag import (
+    ETAG_HEADERS,
+    NOT_MODIFIED,
+    RevisionHasher,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_etag,
+)
+from app.core.responses import FastJSONResponse, dumps
+from app.db.revisions import get_revision, set_revision
+from app.db.session import AnySession, get_db, get_session, run_db
 from app.models.timetable import TimetableEntry, TimetableVersion
+from app.services.class_sessions import drop_sessions_outside_period, materialize_sessions
+from app.services.fet_csv import iter_fet_rows
+from app.services.timetable_conflicts import conflict_counts, conflict_rows, find_conflicts, version_conflicts
+from app.services.timetable_import import (
+    ENTRY_COLUMNS,
+    entries_revision,
+    get_or_create_version,
+    normalize_entry,
+    search_key,
+    set_version_period,
+    sync_entries,
+)
 
 router = APIRouter(prefix="/timetable", tags=["timetable"])
 
+# respostas do GET /timetable/{code}, chave = (version_id, revision, filtros normalizados).
+# Uma versão só muda no import_timetable, que invalida as chaves dela; a revision
+# na chave garante que outros workers não sirvam conteúdo antigo.
+_timetable_cache = LRUCache(maxsize=settings.TIMETABLE_CACHE_SIZE)
+
 
 # ----------------------------
-# Helpers (turma/código/curso)
+# Revisões (ETag)
 # ----------------------------
 
-_CLASS_CODE_RE = re.compile(r"\((\d+\.\d+\.\d+[A-Za-z])\)")
+VERSIONS_SCOPE = "timetable_versions"
 
-def extract_class_code(group_code: str | None) -> str | None:
-    """
-    Extrai '1.18.1I' de strings como:
-      '1º INFOR_M(1.18.1I) sala-03'
-    """
-    if not group_code:
-        return None
-    m = _CLASS_CODE_RE.search(group_code)
-    return m.group(1).upper() if m else None
+def _version_revision(db: Session, tv: TimetableVersion) -> str:
+    # sem revision (a migration 8c3f21d6e5a7 preenche; o import grava): calcula sem gravar
+    if tv.revision is not None:
+        return tv.revision
+    rows = db.execute(
+        select(*(getattr(TimetableEntry, c) for c in ENTRY_COLUMNS))
+        .where(TimetableEntry.timetable_version_id == tv.id)
+    ).mappings()
+    return entries_revision(rows)
 
 
-def course_from_class_code(class_code: str | None) -> str | None:
-    """
-    Regra: x.18.y = Informática | x.28.y = Meio Ambiente
-    """
-    if not class_code:
-        return None
-    parts = class_code.split(".")
-    if len(parts) < 2:
-        return None
-    return {"18": "Informática", "28": "Meio Ambiente"}.get(parts[1])
+def _versions_revision(db: Session) -> str:
+    hasher = RevisionHasher()
+    for row in db.execute(
+        select(
+            TimetableVersion.id,
+            TimetableVersion.code,
+            TimetableVersion.start_date,
+            TimetableVersion.end_date,
+            TimetableVersion.source,
+            TimetableVersion.note,
+        )
+    ).all():
+        hasher.add(row)
+    return hasher.hexdigest()
 
 
-def slugify(text: str | None) -> str:
-    s = (text or "").strip().lower()
-    s = re.sub(r"[^\w\s-]", "", s, flags=re.UNICODE)
-    s = re.sub(r"[\s_-]+", "-", s).strip("-")
-    return s or "unknown"
+# GETs com ETag: o corpo sai pronto em FastJSONResponse (sem response_model) ou 304
+_CONDITIONAL = {200: {"headers": ETAG_HEADERS}, **NOT_MODIFIED}
 
 
 # ----------------------------
 # GET: versions
 # ----------------------------
 
-@router.get("/versions", dependencies=[Depends(get_current_user)])
-def list_versions(db: Session = Depends(get_db)):
-    rows = db.execute(
-        select(TimetableVersion).order_by(TimetableVersion.id.desc())
-    ).scalars().all()
+@router.get(
+    "/versions",
+    response_class=FastJSONResponse,
+    responses=_CONDITIONAL,
+    dependencies=[Depends(get_current_user)],
+)
+async def list_versions(
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_session),
+):
+    return await run_db(db, _list_versions, if_none_match)
 
-    return [
+
+def _list_versions(db: Session, if_none_match: str | None):
+    etag = make_etag(get_revision(db, VERSIONS_SCOPE, compute=lambda: _versions_revision(db)))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    rows = db.execute(
+        select(
+            TimetableVersion.id,
+            TimetableVersion.code,
+            TimetableVersion.start_date,
+            TimetableVersion.end_date,
+            TimetableVersion.source,
+            TimetableVersion.note,
+        ).order_by(TimetableVersion.id.desc())
+    ).all()
+
+    response = FastJSONResponse([
         {
             "id": v.id,
             "code": v.code,
@@ -72,22 +130,26 @@ def list_versions(db: Session = Depends(get_db)):
             "note": v.note,
         }
         for v in rows
-    ]
+    ])
+    set_etag(response, etag)
+    return response
 
 
 # ----------------------------
-# GET: filters (listas únicas)
+# GET: cache stats
 # ----------------------------
 
-@router.get("/{timetable_code}/filters", dependencies=[Depends(get_current_user)])
-def get_filters(timetable_code: str, db: Session = Depends(get_db)):
-    tv = db.execute(
-        select(TimetableVersion).where(TimetableVersion.code == timetable_code)
-    ).scalar_one_or_none()
+@router.get("/cache/stats", dependencies=[Depends(get_current_user)])
+async def cache_stats():
+    return _timetable_cache.stats()
 
-    if not tv:
-        raise HTTPException(status_code=404, detail="timetable not found")
 
+# ----------------------------
+# GET: filters (listas únicas)
+# ----------------------------
+
+def _filters_catalog_from_db(db: Session, timetable_version_id: int) -> Dict[str, List[str]]:
+    # fallback só de leitura para versão sem filters_catalog
     base = (
         select(
             TimetableEntry.class_code,
@@ -95,66 +157,116 @@ def get_filters(timetable_code: str, db: Session = Depends(get_db)):
             TimetableEntry.teacher_name,
             TimetableEntry.room_name,
         )
-        .where(TimetableEntry.timetable_version_id == tv.id)
+        .where(TimetableEntry.timetable_version_id == timetable_version_id)
         .subquery()
     )
 
-    class_codes = db.execute(
-        select(base.c.class_code)
-        .where(base.c.class_code.is_not(None))
-        .where(func.length(func.trim(base.c.class_code)) > 0)
-        .distinct()
-        .order_by(base.c.class_code)
-    ).scalars().all()
-
-    courses = db.execute(
-        select(base.c.course_name)
-        .where(base.c.course_name.is_not(None))
-        .where(func.length(func.trim(base.c.course_name)) > 0)
-        .distinct()
-        .order_by(base.c.course_name)
-    ).scalars().all()
-
-    teachers = db.execute(
-        select(base.c.teacher_name)
-        .where(base.c.teacher_name.is_not(None))
-        .where(func.length(func.trim(base.c.teacher_name)) > 0)
-        .distinct()
-        .order_by(base.c.teacher_name)
-    ).scalars().all()
-
-    rooms = db.execute(
-        select(base.c.room_name)
-        .where(base.c.room_name.is_not(None))
-        .where(func.length(func.trim(base.c.room_name)) > 0)
-        .distinct()
-        .order_by(base.c.room_name)
-    ).scalars().all()
+    def distinct_values(col) -> List[str]:
+        return db.execute(
+            select(col)
+            .where(col.is_not(None))
+            .where(func.length(func.trim(col)) > 0)
+            .distinct()
+            .order_by(col)
+        ).scalars().all()
 
     return {
+        "class_codes": distinct_values(base.c.class_code),
+        "courses": distinct_values(base.c.course_name),
+        "teachers": distinct_values(base.c.teacher_name),
+        "rooms": distinct_values(base.c.room_name),
+    }
+
+
+@router.get(
+    "/{timetable_code}/filters",
+    response_class=FastJSONResponse,
+    responses=_CONDITIONAL,
+    dependencies=[Depends(get_current_user)],
+)
+async def get_filters(
+    timetable_code: str,
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_session),
+):
+    return await run_db(db, _get_filters, timetable_code, if_none_match)
+
+
+def _get_filters(db: Session, timetable_code: str, if_none_match: str | None):
+    tv = db.execute(
+        select(TimetableVersion)
+        .where(TimetableVersion.code == timetable_code)
+        .options(undefer(TimetableVersion.filters_catalog))
+    ).scalar_one_or_none()
+
+    if not tv:
+        raise HTTPException(status_code=404, detail="timetable not found")
+
+    etag = make_etag(_version_revision(db, tv), "filters")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # sem catálogo (a migration 5b1e7c2a9d40 preenche; o import grava): calcula sem gravar
+    catalog = tv.filters_catalog
+    if catalog is None:
+        catalog = _filters_catalog_from_db(db, tv.id)
+
+    response = FastJSONResponse({
         "timetable_code": tv.code,
-        "class_codes": class_codes,   # turma limpa: 1.18.1I etc
-        "courses": courses,           # Informática / Meio Ambiente
-        "teachers": teachers,
-        "rooms": rooms,
+        "class_codes": catalog["class_codes"],   # turma limpa: 1.18.1I etc
+        "courses": catalog["courses"],           # Informática / Meio Ambiente
+        "teachers": catalog["teachers"],
+        "rooms": catalog["rooms"],
         "weekdays": [0, 1, 2, 3, 4, 5, 6],
-    }
+    })
+    set_etag(response, etag)
+    return response
 
 
 # ----------------------------
 # GET: timetable (com filtros combináveis)
 # ----------------------------
 
-@router.get("/{timetable_code}", dependencies=[Depends(get_current_user)])
-def get_timetable(
+def _contains_pattern(text: str) -> str:
+    key = search_key(text) or ""
+    key = key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{key}%"
+
+
+@router.get(
+    "/{timetable_code}",
+    response_class=FastJSONResponse,
+    responses=_CONDITIONAL,
+    dependencies=[Depends(get_current_user)],
+)
+async def get_timetable(
     timetable_code: str,
     group: str | None = Query(None, description="Turma (class_code). Ex: 1.18.1I"),
     course: str | None = Query(None, description="Curso. Ex: Informática | Meio Ambiente"),
     teacher: str | None = Query(None, description="Professor (contém)"),
     room: str | None = Query(None, description="Local (contém)"),
     weekday: int | None = Query(None, ge=0, le=6, description="0=Seg ... 6=Dom"),
-    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_session),
 ):
+    group = group.upper() if group else None
+    filters_key = (group, course or None, teacher or None, room or None, weekday)
+    result = await run_db(db, _get_timetable, timetable_code, filters_key, if_none_match)
+    if isinstance(result, Response):
+        return result
+
+    # cache miss: a serialização (o pedaço caro) roda fora da sessão/event loop
+    etag, cache_key, payload = result
+    body = await run_in_threadpool(dumps, payload)
+    _timetable_cache.set(cache_key, body)
+
+    response = FastJSONResponse(body)
+    set_etag(response, etag)
+    return response
+
+
+def _get_timetable(db: Session, timetable_code: str, filters_key: tuple, if_none_match: str | None):
+    """Resposta pronta (304 / cache hit) ou (etag, cache_key, payload) para serializar."""
     tv = db.execute(
         select(TimetableVersion).where(TimetableVersion.code == timetable_code)
     ).scalar_one_or_none()
@@ -162,19 +274,63 @@ def get_timetable(
     if not tv:
         raise HTTPException(status_code=404, detail="timetable not found")
 
-    q = select(TimetableEntry).where(TimetableEntry.timetable_version_id == tv.id)
+    revision = _version_revision(db, tv)
+
+    etag = make_etag(revision, *filters_key)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # o cache guarda o corpo já serializado
+    cache_key = (tv.id, revision, *filters_key)
+    body = _timetable_cache.get(cache_key)
+    if body is None:
+        return etag, cache_key, _timetable_payload(db, tv, *filters_key)
+
+    response = FastJSONResponse(body)
+    set_etag(response, etag)
+    return response
+
+
+# colunas lidas (tuplas, sem hidratar ORM) -> chaves no JSON
+_TIMETABLE_FIELDS = (
+    (TimetableEntry.weekday, "weekday"),
+    (TimetableEntry.slot, "slot"),
+    (TimetableEntry.class_code, "class_code"),
+    (TimetableEntry.course_name, "course_name"),
+    (TimetableEntry.subject_name, "subject_name"),
+    (TimetableEntry.teacher_name, "teacher_name"),
+    (TimetableEntry.room_name, "room_name"),
+    (TimetableEntry.group_code, "group_code_raw"),
+)
+_TIMETABLE_KEYS = tuple(key for _, key in _TIMETABLE_FIELDS)
+
+
+def _timetable_payload(
+    db: Session,
+    tv: TimetableVersion,
+    group: str | None,
+    course: str | None,
+    teacher: str | None,
+    room: str | None,
+    weekday: int | None,
+) -> Dict[str, Any]:
+    q = (
+        select(*(col for col, _ in _TIMETABLE_FIELDS))
+        .where(TimetableEntry.timetable_version_id == tv.id)
+    )
 
     if group:
-        q = q.where(TimetableEntry.class_code == group.upper())
+        q = q.where(TimetableEntry.class_code == group)
 
     if course:
         q = q.where(TimetableEntry.course_name == course)
 
+    # "contém" sem acento/caixa nas colunas *_search (índice GIN pg_trgm)
     if teacher:
-        q = q.where(TimetableEntry.teacher_name.ilike(f"%{teacher}%"))
+        q = q.where(TimetableEntry.teacher_search.like(_contains_pattern(teacher), escape="\\"))
 
     if room:
-        q = q.where(TimetableEntry.room_name.ilike(f"%{room}%"))
+        q = q.where(TimetableEntry.room_search.like(_contains_pattern(room), escape="\\"))
 
     if weekday is not None:
         q = q.where(TimetableEntry.weekday == weekday)
@@ -185,108 +341,289 @@ def get_timetable(
         TimetableEntry.class_code,
     )
 
-    entries = db.execute(q).scalars().all()
+    entries = [dict(zip(_TIMETABLE_KEYS, row)) for row in db.execute(q).tuples()]
 
     return {
         "timetable_code": tv.code,
         "filters": {
-            "group": group.upper() if group else None,
+            "group": group,
             "course": course,
             "teacher": teacher,
             "room": room,
             "weekday": weekday,
         },
         "count": len(entries),
-        "entries": [
-            {
-                "weekday": e.weekday,
-                "slot": e.slot,
-                "class_code": e.class_code,
-                "course_name": e.course_name,
-                "subject_name": e.subject_name,
-                "teacher_name": e.teacher_name,
-                "room_name": e.room_name,
-                "group_code_raw": e.group_code,
-            }
-            for e in entries
-        ],
+        "entries": entries,
     }
 
 
 # ----------------------------
-# POST: import (script manda payload)
+# GET: conflitos (professor/sala/turma no mesmo horário)
 # ----------------------------
 
-@router.post("/import", status_code=200, dependencies=[Depends(get_current_user)])
-def import_timetable(
-    payload: List[Dict[str, Any]],
+@router.get(
+    "/{timetable_code}/conflicts",
+    response_class=FastJSONResponse,
+    responses=_CONDITIONAL,
+    dependencies=[Depends(get_current_user)],
+)
+async def get_conflicts(
+    timetable_code: str,
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_session),
+):
+    result = await run_db(db, _get_conflicts, timetable_code, if_none_match)
+    if isinstance(result, Response):
+        return result
+
+    # o passe do find_conflicts é CPU: fora do run_sync
+    etag, code, rows = result
+    conflicts = await run_in_threadpool(find_conflicts, rows)
+    response = FastJSONResponse({
+        "timetable_code": code,
+        "counts": conflict_counts(conflicts),
+        "conflicts": conflicts,
+    })
+    set_etag(response, etag)
+    return response
+
+
+def _get_conflicts(db: Session, timetable_code: str, if_none_match: str | None):
+    tv = db.execute(
+        select(TimetableVersion).where(TimetableVersion.code == timetable_code)
+    ).scalar_one_or_none()
+
+    if not tv:
+        raise HTTPException(status_code=404, detail="timetable not found")
+
+    etag = make_etag(_version_revision(db, tv), "conflicts")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return etag, tv.code, conflict_rows(db, tv.id)
+
+
+# ----------------------------
+# POST: materializa aulas (class_sessions)
+# ----------------------------
+
+@router.post("/{timetable_code}/sessions/materialize", dependencies=[Depends(get_current_user)])
+async def materialize_timetable_sessions(
+    timetable_code: str,
+    date_from: date | None = Query(None, alias="from", description="Refaz só a partir deste dia"),
+    date_to: date | None = Query(None, alias="to", description="Refaz só até este dia"),
     db: Session = Depends(get_db),
 ):
-    if not payload:
-        raise HTTPException(status_code=400, detail="empty payload")
+    return await run_db(db, _materialize_timetable_sessions, timetable_code, date_from, date_to)
 
-    code = payload[0].get("timetable_code")
-    if not code:
-        raise HTTPException(status_code=400, detail="timetable_code missing")
 
+def _materialize_timetable_sessions(
+    db: Session,
+    timetable_code: str,
+    date_from: date | None,
+    date_to: date | None,
+):
     tv = db.execute(
-        select(TimetableVersion).where(TimetableVersion.code == code)
+        select(TimetableVersion).where(TimetableVersion.code == timetable_code)
     ).scalar_one_or_none()
 
     if not tv:
-        tv = TimetableVersion(
-            code=code,
-            start_date=date(2026, 1, 1),
-            end_date=date(2026, 12, 31),
-            source="r2",
-            note="import timetable",
-        )
-        db.add(tv)
-        db.commit()
-        db.refresh(tv)
+        raise HTTPException(status_code=404, detail="timetable not found")
 
-    db.execute(delete(TimetableEntry).where(TimetableEntry.timetable_version_id == tv.id))
+    result = materialize_sessions(db, tv, first=date_from, last=date_to)
     db.commit()
+    return {"timetable_code": tv.code, **result}
 
-    entries: List[TimetableEntry] = []
 
-    for row in payload:
-        weekday = row.get("weekday")
-        slot = row.get("slot")
-        group_code = row.get("group_code")
+# ----------------------------
+# POST: import (script manda payload)
+# ----------------------------
 
-        subject_name = row.get("subject_name")
-        teacher_name = row.get("teacher_name")
-        room = row.get("room")
+# Imports e materialize usam sempre a Session síncrona (threadpool), mesmo com
+# DB_ASYNC: o diff do sync_entries, o find_conflicts e o parse do CSV são CPU
+# intercalada com SQL e, no run_sync da AsyncSession, rodariam no event loop.
+
+def _import_entries(
+    db: Session,
+    code: str,
+    payload: Iterable[Dict[str, Any]],
+    require_rows: bool = False,
+    strict: bool = False,
+    start: date | None = None,
+    end: date | None = None,
+) -> Dict[str, Any]:
+    # version + diff (insert/update/delete) numa transação só
+    tv, created = get_or_create_version(db, code, start, end)
+    period_changed = not created and set_version_period(tv, start, end)
+    if tv.end_date < tv.start_date:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if created or period_changed:
+        set_revision(db, VERSIONS_SCOPE, _versions_revision(db))
+
+    entries = (e for e in map(normalize_entry, payload) if e is not None)
+    diff = sync_entries(db, tv, entries)
+    if require_rows and not diff["total"]:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="no valid rows (weekday/slot/group_code)")
+
+    # checagem de choques só quando algo mudou (import sem mudança continua de graça)
+    conflicts = None
+    if diff["changed_weekdays"]:
+        found = version_conflicts(db, tv.id)
+        conflicts = conflict_counts(found)
+        if strict and any(conflicts.values()):
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "timetable has conflicts", "counts": conflicts, "conflicts": found},
+            )
 
-        if weekday is None or slot is None or group_code is None:
-            continue
+    # aulas previstas só são refeitas nos dias da semana que mudaram (vigência nova: a versão toda)
+    sessions = None
+    if settings.SESSIONS_AUTO_MATERIALIZE and period_changed:
+        dropped = drop_sessions_outside_period(db, tv)
+        sessions = materialize_sessions(db, tv)
+        sessions["deleted"] += dropped
+    elif settings.SESSIONS_AUTO_MATERIALIZE and diff["changed_weekdays"]:
+        sessions = materialize_sessions(db, tv, weekdays=diff["changed_weekdays"])
+    db.commit()
 
-        class_code = extract_class_code(group_code)
-        course_name = course_from_class_code(class_code)
+    if diff["changed_weekdays"]:
+        _timetable_cache.invalidate(lambda key: key[0] == tv.id)
 
-        entries.append(
-            TimetableEntry(
-                timetable_version_id=tv.id,
-                weekday=int(weekday),
-                slot=str(slot),
+    return {
+        "ok": True,
+        "timetable_code": code,
+        "start_date": str(tv.start_date),
+        "end_date": str(tv.end_date),
+        "entries_total": diff["total"],
+        "entries_inserted": diff["inserted"],
+        "entries_updated": diff["updated"],
+        "entries_deleted": diff["deleted"],
+        "entries_unchanged": diff["unchanged"],
+        "conflicts": conflicts,
+        "sessions": sessions,
+    }
 
-                group_code=str(group_code),
-                class_code=class_code,
-                course_name=course_name,
 
-                subject_code=slugify(subject_name),
-                subject_name=subject_name,
+@router.post("/import", status_code=200, dependencies=[Depends(get_current_user)])
+async def import_timetable(
+    payload: List[Dict[str, Any]],
+    strict: bool = Query(False, description="Recusa (409) se houver choque de professor/sala/turma"),
+    start: date | None = Query(None, description="Início da vigência (versão nova: padrão é o 1º dia do calendário no ano do código)"),
+    end: date | None = Query(None, description="Fim da vigência (versão nova: padrão é o último dia do calendário no ano do código)"),
+    db: Session = Depends(get_db),
+):
+    if not payload:
+        raise HTTPException(status_code=400, detail="empty payload")
 
-                teacher_username=slugify(teacher_name) if teacher_name else None,
-                teacher_name=teacher_name,
+    code = payload[0].get("timetable_code")
+    if not code:
+        raise HTTPException(status_code=400, detail="timetable_code missing")
 
-                room_code=slugify(room) if room else None,
-                room_name=str(room) if room else None,
-            )
-        )
+    return await run_db(db, _import_entries, code, payload, strict=strict, start=start, end=end)
 
-    db.add_all(entries)
-    db.commit()
 
-    return {"ok": True, "timetable_code": code, "entries_inserted": len(entries)}
\ No newline at end of file
+# ----------------------------
+# POST: import do CSV cru do FET (opcionalmente gzip)
+# ----------------------------
+
+# acima disso o corpo recebido vai para disco (memória fica constante)
+_CSV_SPOOL_BYTES = 1024 * 1024
+
+
+def _csv_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413, detail=f"csv larger than {settings.TIMETABLE_CSV_MAX_BYTES} bytes"
+    )
+
+
+def _spool_chunk(spool, inflater, chunk: bytes) -> None:
+    # inflate + escrita (o spool pode já estar em disco) fora do event loop
+    room = settings.TIMETABLE_CSV_MAX_BYTES - spool.tell()
+    if inflater:
+        # max_length: um gzip bomb não chega a expandir em memória além do teto
+        data = inflater.decompress(chunk, room + 1)
+        if inflater.unconsumed_tail:
+            raise _csv_too_large()
+    else:
+        data = chunk
+    if len(data) > room:
+        raise _csv_too_large()
+    spool.write(data)
+
+
+def _import_csv_file(
+    db: Session,
+    code: str,
+    raw,
+    strict: bool = False,
+    start: date | None = None,
+    end: date | None = None,
+) -> Dict[str, Any]:
+    # utf-8-sig remove BOM (aquele caractere invisível que aparece na primeira coluna)
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    try:
+        return _import_entries(db, code, iter_fet_rows(text, code), require_rows=True, strict=strict, start=start, end=end)
+    except UnicodeDecodeError:
+        # ex.: CSV salvo em Latin-1 pelo Excel
+        db.rollback()
+        raise HTTPException(status_code=400, detail="csv is not valid UTF-8; export it as UTF-8")
+    except csv.Error as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"malformed csv: {e}")
+    finally:
+        text.close()
+
+
+@router.post("/import/csv", status_code=200, dependencies=[Depends(get_current_user)])
+async def import_timetable_csv(
+    request: Request,
+    timetable_code: str = Query(..., min_length=1, max_length=20),
+    strict: bool = Query(False, description="Recusa (409) se houver choque de professor/sala/turma"),
+    start: date | None = Query(None, description="Início da vigência (versão nova: padrão é o 1º dia do calendário no ano do código)"),
+    end: date | None = Query(None, description="Fim da vigência (versão nova: padrão é o último dia do calendário no ano do código)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Recebe o CSV do FET como corpo cru (text/csv, aceita gzip via
+    Content-Encoding ou pelos magic bytes). O corpo é descompactado
+    enquanto chega (no threadpool) e o parse/insert rodam linha a linha via run_db.
+    Corpo ou CSV descompactado acima de TIMETABLE_CSV_MAX_BYTES: 413.
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > settings.TIMETABLE_CSV_MAX_BYTES:
+        raise _csv_too_large()
+
+    gzipped = "gzip" in request.headers.get("content-encoding", "").lower()
+    inflater = None
+    spool = tempfile.SpooledTemporaryFile(max_size=_CSV_SPOOL_BYTES)
+
+    try:
+        first = True
+        received = 0
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            received += len(chunk)
+            if received > settings.TIMETABLE_CSV_MAX_BYTES:
+                raise _csv_too_large()
+            if first:
+                gzipped = gzipped or chunk[:2] == b"\x1f\x8b"
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+                first = False
+            try:
+                await run_in_threadpool(_spool_chunk, spool, inflater, chunk)
+            except zlib.error:
+                raise HTTPException(status_code=400, detail="invalid gzip body")
+
+        if first:
+            raise HTTPException(status_code=400, detail="empty payload")
+        if inflater:
+            await run_in_threadpool(_spool_chunk, spool, None, inflater.flush())
+        spool.seek(0)
+
+        return await run_db(db, _import_csv_file, timetable_code, spool, strict, start=start, end=end)
+    finally:
+        spool.close()
@@ -1,46 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import or_, select
 
-from app.db.session import get_db
+from app.core.responses import FastJSONResponse
+from app.db.bulk import upsert_insert
+from app.db.session import AnySession, get_db, get_session, run_db
 from app.models.user import User
-from app.schemas import UserCreate, UserOut, UserUpdate
+from app.schemas import UserBulkResult, UserCreate, UserListItem, UserOut, UserUpdate
 from app.api.deps import get_current_user
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
 
-@router.get("", response_model=list[UserOut])
-def list_users(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    return db.execute(select(User).order_by(User.id)).scalars().all()
+# usernames por SELECT ... IN no bulk (limite de parâmetros do driver)
+_LOOKUP_CHUNK = 5000
 
+# colunas aceitas em ?fields= (id sempre vem: é o cursor)
+USER_FIELDS = ("id", "username", "full_name", "role")
+
+
+# ----------------------------
+# Queries (síncronas; rodam via run_db)
+# ----------------------------
+
+def _parse_fields(fields: str | None) -> list[str]:
+    if not fields:
+        return list(USER_FIELDS)
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(USER_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"unknown fields: {', '.join(sorted(unknown))}")
+    return [f for f in USER_FIELDS if f == "id" or f in wanted]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _list_users(
+    db: Session,
+    request: Request,
+    fields: list[str],
+    role: str | None,
+    username_prefix: str | None,
+    after: int | None,
+    limit: int,
+) -> FastJSONResponse:
+    # keyset por id: custo depende do limit, não de quantas páginas já passaram
+    q = select(*(getattr(User, f) for f in fields))
+    if role:
+        q = q.where(User.role == role)
+    if username_prefix:
+        q = q.where(User.username.like(_escape_like(username_prefix) + "%", escape="\\"))
+    if after is not None:
+        q = q.where(User.id > after)
+
+    users = [row._asdict() for row in db.execute(q.order_by(User.id).limit(limit + 1))]
+
+    response = FastJSONResponse(users[:limit])
+    if len(users) > limit:
+        next_after = str(users[limit - 1]["id"])
+        response.headers["X-Next-After"] = next_after
+        response.headers["Link"] = f'<{request.url.include_query_params(after=next_after)}>; rel="next"'
+    return response
+
+
+def _is_unique_violation(e: IntegrityError) -> bool:
+    # 23505 = unique_violation (psycopg2 e o adaptador asyncpg expõem em pgcode)
+    if getattr(e.orig, "pgcode", None) == "23505":
+        return True
+    # sqlite (benchmarks/testes locais)
+    return getattr(e.orig, "sqlite_errorname", None) == "SQLITE_CONSTRAINT_UNIQUE"
 
-@router.post("", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def create_user(payload: UserCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    exists = db.execute(select(User).where(User.username == payload.username)).scalar_one_or_none()
-    if exists:
-        raise HTTPException(status_code=409, detail="username already exists")
 
+def _create_user(db: Session, payload: UserCreate) -> UserOut:
+    # a UNIQUE de username decide; sem SELECT antes do INSERT
     user = User(username=payload.username, full_name=payload.full_name, role=payload.role)
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        # só a UNIQUE de username vira 409; NOT NULL/FK/CHECK seguem como erro
+        if _is_unique_violation(e):
+            raise HTTPException(status_code=409, detail="username already exists")
+        raise
     db.refresh(user)
-    return user
+    return UserOut.model_validate(user)
+
+
+def _bulk_create_users(db: Session, payload: list[UserCreate], update: bool) -> UserBulkResult:
+    rows: dict[str, dict] = {}
+    duplicates: list[str] = []
+    for item in payload:
+        if item.username in rows:
+            duplicates.append(item.username)
+        rows[item.username] = {"username": item.username, "full_name": item.full_name, "role": item.role}
+    if not rows:
+        return UserBulkResult(total=0, inserted=0, updated=0, conflicts=[], duplicates=[])
+
+    # quem já existia: com ON CONFLICT, linha devolvida no RETURNING e já existente = atualizada
+    existing: set[str] = set()
+    usernames = list(rows)
+    for i in range(0, len(usernames), _LOOKUP_CHUNK):
+        existing.update(db.execute(
+            select(User.username).where(User.username.in_(usernames[i:i + _LOOKUP_CHUNK]))
+        ).scalars())
+
+    stmt = upsert_insert(db, User)
+    if update:
+        # só reescreve quem mudou: linha igual não volta no RETURNING e conta como conflito
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.username],
+            set_={"full_name": stmt.excluded.full_name, "role": stmt.excluded.role},
+            where=or_(
+                User.full_name.is_distinct_from(stmt.excluded.full_name),
+                User.role.is_distinct_from(stmt.excluded.role),
+            ),
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[User.username])
+    stmt = stmt.returning(User.username)
+
+    written = set(db.execute(stmt, list(rows.values())).scalars())
+    updated = len(written & existing)
+    inserted = len(written) - updated
+    db.commit()
 
+    return UserBulkResult(
+        total=len(rows),
+        inserted=inserted,
+        updated=updated,
+        conflicts=sorted(set(rows) - written),
+        duplicates=sorted(set(duplicates)),
+    )
 
-@router.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+
+def _get_user(db: Session, user_id: int) -> User:
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="user not found")
     return user
 
 
-@router.patch("/{user_id}", response_model=UserOut)
-def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="user not found")
+def _read_user(db: Session, user_id: int) -> UserOut:
+    return UserOut.model_validate(_get_user(db, user_id))
+
+
+def _update_user(db: Session, user_id: int, payload: UserUpdate) -> UserOut:
+    user = _get_user(db, user_id)
 
     if payload.full_name is not None:
         user.full_name = payload.full_name
@@ -49,15 +160,73 @@ def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)
 
     db.commit()
     db.refresh(user)
-    return user
-
+    return UserOut.model_validate(user)
 
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="user not found")
 
+def _delete_user(db: Session, user_id: int) -> None:
+    user = _get_user(db, user_id)
     db.delete(user)
     db.commit()
-    return None
\ No newline at end of file
+
+
+# ----------------------------
+# Rotas
+# ----------------------------
+
+# sem response_model: ?fields= devolve só parte das colunas, já serializadas
+@router.get(
+    "",
+    response_class=FastJSONResponse,
+    responses={
+        200: {
+            "model": list[UserListItem],
+            "headers": {
+                "X-Next-After": {"description": "Cursor da próxima página (só se houver mais)", "schema": {"type": "string"}},
+                "Link": {"description": 'rel="next" com o after preenchido', "schema": {"type": "string"}},
+            },
+        },
+    },
+)
+async def list_users(
+    request: Request,
+    role: str | None = Query(None, max_length=30),
+    username_prefix: str | None = Query(None, max_length=50),
+    fields: str | None = Query(None, description="Ex: id,username (default: todos)"),
+    after: int | None = Query(None, description="Cursor: devolve ids > after (ver header X-Next-After)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AnySession = Depends(get_session),
+    current_user = Depends(get_current_user),
+):
+    columns = _parse_fields(fields)
+    return await run_db(db, _list_users, request, columns, role, username_prefix, after, limit)
+
+
+@router.post("", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def create_user(payload: UserCreate, db: AnySession = Depends(get_session), current_user = Depends(get_current_user)):
+    return await run_db(db, _create_user, payload)
+
+
+@router.post("/bulk", response_model=UserBulkResult)
+async def bulk_create_users(
+    payload: list[UserCreate],
+    on_conflict: str = Query("skip", pattern="^(skip|update)$", description="skip | update (full_name/role)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    return await run_db(db, _bulk_create_users, payload, on_conflict == "update")
+
+
+@router.get("/{user_id}", response_model=UserOut)
+async def get_user(user_id: int, db: AnySession = Depends(get_session), current_user = Depends(get_current_user)):
+    return await run_db(db, _read_user, user_id)
+
+
+@router.patch("/{user_id}", response_model=UserOut)
+async def update_user(user_id: int, payload: UserUpdate, db: AnySession = Depends(get_session), current_user = Depends(get_current_user)):
+    return await run_db(db, _update_user, user_id, payload)
+
+
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_user(user_id: int, db: AnySession = Depends(get_session), current_user = Depends(get_current_user)):
+    await run_db(db, _delete_user, user_id)
+    return None
@@ -4,6 +4,45 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     AUTH_SECRET: str   # 👈 ESTA LINHA É O PONTO-CHAVE
 
+    # tokens: com AUTH_KEY_ID os novos saem "<kid>.<msg>.<sig>"; AUTH_PREVIOUS_KEYS
+    # ("k0:segredo,...") continuam aceitos durante a rotação
+    AUTH_KEY_ID: str | None = None
+    AUTH_PREVIOUS_KEYS: str = ""
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_REVOCATION_REFRESH_SECONDS: float = 30.0
+    # cada worker relê as chaves quando o .env muda (0 = rotação só com restart)
+    AUTH_KEYS_REFRESH_SECONDS: float = 30.0
+
+    # stack async (asyncpg) nas rotas de leitura; sem ASYNC_DATABASE_URL deriva do
+    # DATABASE_URL. Imports (horário/calendário/users bulk) e /calendar/school-days/*
+    # seguem no engine síncrono.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+
+    # pool de conexões (por worker) e timeout por statement em ms (0 = sem limite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # diagnóstico do engine (0 desliga); ajustável em runtime via PUT /diagnostics/db,
+    # que grava em runtime_settings (vale sobre estes) e chega a todos os workers
+    # em até DB_DIAGNOSTICS_REFRESH_SECONDS (0 = não relê; o PUT vale só no worker)
+    DB_SLOW_QUERY_MS: float = 0
+    DB_N_PLUS_ONE_THRESHOLD: int = 0
+    DB_LOG_QUERY_PARAMS: bool = False
+    DB_DIAGNOSTICS_REFRESH_SECONDS: float = 30.0
+
+    # cache em memória do GET /timetable/{code} (0 desliga)
+    TIMETABLE_CACHE_SIZE: int = 512
+
+    # POST /timetable/import/csv: teto do CSV já descompactado (e do corpo gzip); acima, 413
+    TIMETABLE_CSV_MAX_BYTES: int = 50 * 1024 * 1024
+
+    # regenera class_sessions nos imports de horário/calendário
+    SESSIONS_AUTO_MATERIALIZE: bool = True
+
     class Config:
         env_file = ".env"
         extra = "ignore"  # 👈 ISSO EVITA ESSE ERRO PRA SEMPRE
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Iterable
+
+from fastapi import Response
+
+_MOD = 1 << 256
+
+
+class RevisionHasher:
+    """
+    Hash de conteúdo independente da ordem das linhas (soma dos sha256 mod 2^256).
+    Dá pra alimentar linha a linha durante o import, sem guardar nada em memória.
+    """
+
+    def __init__(self) -> None:
+        self._acc = 0
+        self.count = 0
+
+    def add(self, row: Iterable[Any]) -> None:
+        raw = json.dumps(list(row), separators=(",", ":"), ensure_ascii=False, default=str)
+        self._acc = (self._acc + int.from_bytes(hashlib.sha256(raw.encode("utf-8")).digest(), "big")) % _MOD
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        h = hashlib.sha256(self._acc.to_bytes(32, "big"))
+        h.update(str(self.count).encode("ascii"))
+        return h.hexdigest()
+
+
+def chain_revision(previous: str | None, *parts: Any) -> str:
+    """Nova revisão derivada da anterior + o que mudou (para imports parciais)."""
+    h = hashlib.sha256((previous or "").encode("utf-8"))
+    for p in parts:
+        h.update(b"\x00")
+        h.update(str(p).encode("utf-8"))
+    return h.hexdigest()
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag forte: revisão do conteúdo + parâmetros que mudam o corpo."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(b"\x00")
+        h.update(str(p).encode("utf-8"))
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match usa comparação fraca (RFC 9110 13.1.2): ignora o prefixo W/
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
+
+
+# OpenAPI das rotas condicionais: responses={200: {..., "headers": ETAG_HEADERS}, **NOT_MODIFIED}
+ETAG_HEADERS = {"ETag": {"description": "Revisão do conteúdo (mandar em If-None-Match)", "schema": {"type": "string"}}}
+NOT_MODIFIED = {304: {"description": "Não mudou desde o ETag do If-None-Match", "headers": ETAG_HEADERS}}
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# buckets (em segundos / em statements) dos histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """SQL feito durante um request (preenchido pelos eventos do engine)."""
+
+    __slots__ = ("scope", "route", "statements", "db_time", "shapes")
+
+    def __init__(self, scope: Dict[str, Any] | None = None) -> None:
+        self.scope = scope or {}
+        self.route = UNMATCHED_ROUTE
+        self.statements = 0
+        self.db_time = 0.0
+        # formato do statement -> execuções (só com o detector de N+1 ligado)
+        self.shapes: Dict[str, int] = {}
+
+    @property
+    def route_label(self) -> str:
+        """Template da rota já durante o handler (o router grava no scope)."""
+        route = self.scope.get("route")
+        if route is not None:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        return self.scope.get("path", UNMATCHED_ROUTE)
+
+
+# o objeto é mutável: threadpool (contexto copiado) e run_sync enxergam o mesmo
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # último = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Métricas por rota (template do path, não a URL) em memória do worker."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.statements: Dict[Tuple[str, str], Histogram] = {}
+        self.status: Dict[Tuple[str, str, int], int] = {}
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.status[(method, route, status)] = self.status.get((method, route, status), 0) + 1
+            self._hist(self.latency, key, LATENCY_BUCKETS).observe(elapsed)
+            self._hist(self.db_time, key, LATENCY_BUCKETS).observe(stats.db_time)
+            self._hist(self.statements, key, STATEMENT_BUCKETS).observe(stats.statements)
+
+    @staticmethod
+    def _hist(store: Dict[Tuple[str, str], Histogram], key: Tuple[str, str], buckets) -> Histogram:
+        hist = store.get(key)
+        if hist is None:
+            hist = store[key] = Histogram(buckets)
+        return hist
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        """Formato texto do Prometheus (exposition format 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            lines += [
+                "# HELP http_requests_in_flight Requests sendo atendidos agora.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Requests por rota e status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), n in sorted(self.status.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {n}")
+            _render_histograms(lines, "http_request_duration_seconds", "Latência do request.", self.latency)
+            _render_histograms(lines, "db_time_seconds", "Tempo em SQL por request.", self.db_time)
+            _render_histograms(lines, "db_statements", "Statements SQL por request.", self.statements)
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _render_histograms(lines: List[str], name: str, help_text: str, store: Dict[Tuple[str, str], Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), hist in sorted(store.items()):
+        acc = 0
+        for bound, n in zip(hist.buckets, hist.counts):
+            acc += n
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {acc}")
+        lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {hist.count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {hist.total:.6f}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {hist.count}")
+
+
+def gauge_lines(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, Any], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines += [f"{name}{_labels(**labels)} {value}" for labels, value in samples]
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+# ----------------------------
+# Middleware (ASGI puro: sem o custo do BaseHTTPMiddleware)
+# ----------------------------
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: MetricsRegistry = registry, exclude: Tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.registry = registry
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.registry.started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # o router do FastAPI grava a rota casada no próprio scope
+            stats.route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.registry.finished(scope["method"], stats.route, status_code, time.perf_counter() - started, stats)
+            current_request.reset(token)
+
+
+# ----------------------------
+# Eventos do engine: SQL por request
+# ----------------------------
+
+def instrument_engine(engine: Engine) -> None:
+    """Soma statements e tempo de SQL no request corrente (sync engine ou async_engine.sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["_metrics_started"].pop()
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += time.perf_counter() - started
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("_metrics_started"):
+            conn.info["_metrics_started"].pop()
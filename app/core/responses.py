@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """JSON em bytes: orjson quando instalado, senão json da stdlib."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+# listas acima disso são serializadas no threadpool, não no event loop
+_INLINE_ITEMS = 200
+
+
+def _is_large(content: Any) -> bool:
+    if isinstance(content, (list, tuple)):
+        return len(content) > _INLINE_ITEMS
+    if isinstance(content, dict):
+        return any(isinstance(v, (list, tuple, dict)) and len(v) > _INLINE_ITEMS for v in content.values())
+    return False
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Resposta JSON sem passar pelo jsonable_encoder do FastAPI.
+
+    Aceita o conteúdo já serializado (bytes, ex. vindo do cache) ou
+    dicts/listas de tipos simples (str, int, date...). Conteúdo grande só é
+    serializado no envio, no threadpool: o handler pode montar a resposta
+    dentro do run_sync (DB_ASYNC) sem o encode travar o event loop.
+    """
+
+    # status_code explícito: o OpenAPI do FastAPI tira o status padrão da assinatura
+    def __init__(self, content: Any = None, status_code: int = 200, *args: Any, **kwargs: Any) -> None:
+        self._pending = content if _is_large(content) else None
+        super().__init__(content, status_code, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes | None:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        if self._pending is not None:
+            return None  # adiado para o __call__ (init_headers pula o content-length)
+        return dumps(content)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self._pending is not None:
+            self.body = await run_in_threadpool(dumps, self._pending)
+            self._pending = None
+            self.raw_headers.append((b"content-length", str(len(self.body)).encode("latin-1")))
+        await super().__call__(scope, receive, send)
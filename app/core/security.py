@@ -4,7 +4,8 @@ import hmac
 import hashlib
 import base64
 import json
-from typing import Any, Dict, Optional
+import secrets
+from typing import Any, Dict, Mapping, Optional
 
 # ⚠️ Simples e direto (sem libs externas).
 # Depois a gente troca por JWT de verdade, se quiser.
@@ -16,25 +17,61 @@ def _b64url_decode(data: str) -> bytes:
     padding = "=" * (-len(data) % 4)
     return base64.urlsafe_b64decode((data + padding).encode("utf-8"))
 
-def sign(payload: Dict[str, Any], secret: str, ttl_seconds: int = 60 * 60 * 24) -> str:
+def _mac(secret: str, msg: bytes) -> bytes:
+    return hmac.new(secret.encode("utf-8"), msg, hashlib.sha256).digest()
+
+def sign(
+    payload: Dict[str, Any],
+    secret: str,
+    ttl_seconds: int = 60 * 60 * 24,
+    kid: Optional[str] = None,
+) -> str:
+    """
+    Sem kid: "<msg>.<sig>" (formato antigo). Com kid: "<kid>.<msg>.<sig>",
+    com o kid dentro do HMAC; o verify escolhe a chave pelo kid.
+    """
     now = int(time.time())
     body = {
         "iat": now,
         "exp": now + int(ttl_seconds),
+        "jti": secrets.token_urlsafe(9),  # id curto para revogação
         **payload,
     }
     msg = json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
-    sig = hmac.new(secret.encode("utf-8"), msg, hashlib.sha256).digest()
-    return _b64url_encode(msg) + "." + _b64url_encode(sig)
+    if kid is None:
+        return _b64url_encode(msg) + "." + _b64url_encode(_mac(secret, msg))
+    if not kid or "." in kid:
+        raise ValueError("kid must be non-empty and cannot contain '.'")
+    sig = _mac(secret, kid.encode("utf-8") + b"." + msg)
+    return kid + "." + _b64url_encode(msg) + "." + _b64url_encode(sig)
+
+def token_kid(token: str) -> Optional[str]:
+    """Key id do token (None no formato antigo, sem kid)."""
+    parts = token.split(".")
+    return parts[0] if len(parts) == 3 else None
 
-def verify(token: str, secret: str) -> Optional[Dict[str, Any]]:
+def verify(token: str, secret: str, keys: Optional[Mapping[str, str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    `secret` valida tokens sem kid; `keys` (kid -> secret) valida os com kid,
+    inclusive de chaves antigas ainda aceitas durante a rotação.
+    """
     try:
-        msg_b64, sig_b64 = token.split(".", 1)
-        msg = _b64url_decode(msg_b64)
+        parts = token.split(".")
+        if len(parts) == 3:
+            kid, msg_b64, sig_b64 = parts
+            key = (keys or {}).get(kid)
+            if key is None:
+                return None
+            msg = _b64url_decode(msg_b64)
+            signed = kid.encode("utf-8") + b"." + msg
+        else:
+            msg_b64, sig_b64 = token.split(".", 1)
+            key = secret
+            msg = _b64url_decode(msg_b64)
+            signed = msg
         sig = _b64url_decode(sig_b64)
 
-        expected = hmac.new(secret.encode("utf-8"), msg, hashlib.sha256).digest()
-        if not hmac.compare_digest(sig, expected):
+        if not hmac.compare_digest(sig, _mac(key, signed)):
             return None
 
         payload = json.loads(msg.decode("utf-8"))
@@ -42,4 +79,4 @@ def verify(token: str, secret: str) -> Optional[Dict[str, Any]]:
             return None
         return payload
     except Exception:
-        return None
\ No newline at end of file
+        return None
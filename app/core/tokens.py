@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config import Settings, settings
+from app.core.security import sign, token_kid, verify
+
+
+def parse_keys(raw: str | None) -> Dict[str, str]:
+    """"k1:segredo1,k0:segredo0" -> {"k1": "segredo1", "k0": "segredo0"}."""
+    keys: Dict[str, str] = {}
+    for item in (raw or "").split(","):
+        kid, sep, secret = item.strip().partition(":")
+        if sep and kid and secret:
+            keys[kid.strip()] = secret.strip()
+    return keys
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def token_id(payload: Mapping[str, Any], digest: bytes) -> str:
+    """Id usado na revogação: o jti; tokens antigos (sem jti) usam o digest."""
+    return str(payload.get("jti") or digest.hex()[:32])
+
+
+class RevocationSet:
+    """
+    Ids de tokens revogados ainda não expirados (id -> exp). Fica em memória,
+    recarregado do banco a cada `refresh_seconds` para pegar revogações
+    feitas por outros workers.
+    """
+
+    def __init__(self, refresh_seconds: float = 30.0) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._revoked: Dict[str, int] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def claim_refresh(self) -> bool:
+        """True para um único chamador por intervalo (os outros seguem com o conjunto atual)."""
+        with self._lock:
+            if not self.is_stale():
+                return False
+            self._loaded_at = time.monotonic()
+            return True
+
+    def replace(self, items: Iterable[Tuple[str, int]]) -> None:
+        now = int(time.time())
+        revoked = {tid: exp for tid, exp in items if exp >= now}
+        with self._lock:
+            self._revoked = revoked
+            self._loaded_at = time.monotonic()
+
+    def add(self, tid: str, exp: int) -> None:
+        with self._lock:
+            self._revoked[tid] = exp
+
+    def is_revoked(self, tid: str) -> bool:
+        return tid in self._revoked
+
+
+class TokenVerifier:
+    """
+    verify() com cache: o token já validado (chave = sha256 do token) não
+    passa de novo por base64 + HMAC + json.loads até o seu exp. Cada
+    entrada guarda o kid, então a rotação (set_keys, chamado pelo
+    KeyReloader quando o .env muda) só derruba os tokens das chaves que
+    saíram do chaveiro.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        current_kid: str | None = None,
+        previous_keys: Mapping[str, str] | None = None,
+        cache_size: int = 10000,
+        revocation_refresh_seconds: float = 30.0,
+    ) -> None:
+        self._cache = LRUCache(maxsize=cache_size)
+        self.revocations = RevocationSet(refresh_seconds=revocation_refresh_seconds)
+        self.set_keys(secret, current_kid, previous_keys)
+
+    def set_keys(
+        self,
+        secret: str,
+        current_kid: str | None = None,
+        previous_keys: Mapping[str, str] | None = None,
+    ) -> int:
+        """Troca o chaveiro; retorna quantos tokens em cache foram descartados."""
+        keys = dict(previous_keys or {})
+        if current_kid:
+            keys[current_kid] = secret
+        old_keys = getattr(self, "_keys", {})
+        old_secret = getattr(self, "_secret", secret)
+
+        self._secret = secret
+        self.current_kid = current_kid or None
+        self._keys = keys
+
+        def dropped(key: Tuple[str | None, bytes]) -> bool:
+            kid = key[0]
+            if kid is None:
+                return secret != old_secret
+            return keys.get(kid) != old_keys.get(kid)
+
+        return self._cache.invalidate(dropped)
+
+    def sign(self, payload: Dict[str, Any], ttl_seconds: int) -> str:
+        secret = self._keys[self.current_kid] if self.current_kid else self._secret
+        return sign(payload, secret=secret, ttl_seconds=ttl_seconds, kid=self.current_kid)
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        key = (token_kid(token), token_digest(token))
+        payload = self._cache.get(key)
+        if payload is None:
+            payload = verify(token, self._secret, self._keys)
+            if payload is None:
+                return None
+            self._cache.set(key, payload)
+        elif int(payload.get("exp", 0)) < int(time.time()):
+            return None
+
+        if self.revocations.is_revoked(token_id(payload, key[1])):
+            return None
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "current_kid": self.current_kid,
+            "kids": sorted(self._keys),
+            "revoked": len(self.revocations),
+            "cache": self._cache.stats(),
+        }
+
+
+class KeyReloader:
+    """
+    Rotação sem restart: a cada `refresh_seconds` um request olha o mtime do
+    .env; se mudou, relê AUTH_SECRET / AUTH_KEY_ID / AUTH_PREVIOUS_KEYS e
+    chama set_keys. Cada worker faz isso sozinho, então todos pegam a chave
+    nova em até `refresh_seconds`. Variáveis de ambiente do processo têm
+    prioridade sobre o .env (pydantic-settings): rotação por elas exige restart.
+    """
+
+    def __init__(self, verifier: TokenVerifier, env_file: str | None, refresh_seconds: float = 30.0) -> None:
+        self.verifier = verifier
+        self.env_file = env_file
+        self.refresh_seconds = refresh_seconds
+        self.reloads = 0
+        self._mtime = self._stat()
+        self._checked_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _stat(self) -> float | None:
+        try:
+            return os.stat(self.env_file).st_mtime if self.env_file else None
+        except OSError:
+            return None
+
+    def claim_check(self) -> bool:
+        """True para um único chamador por intervalo (mesmo esquema do RevocationSet)."""
+        if self.refresh_seconds <= 0 or not self.env_file:
+            return False
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.refresh_seconds:
+                return False
+            self._checked_at = time.monotonic()
+            return True
+
+    def reload_if_changed(self) -> int | None:
+        """Tokens descartados do cache, ou None se o .env não mudou."""
+        mtime = self._stat()
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        return self.reload()
+
+    def reload(self) -> int:
+        fresh = Settings()
+        dropped = self.verifier.set_keys(
+            fresh.AUTH_SECRET,
+            current_kid=fresh.AUTH_KEY_ID,
+            previous_keys=parse_keys(fresh.AUTH_PREVIOUS_KEYS),
+        )
+        self.reloads += 1
+        return dropped
+
+
+token_verifier = TokenVerifier(
+    settings.AUTH_SECRET,
+    current_kid=settings.AUTH_KEY_ID,
+    previous_keys=parse_keys(settings.AUTH_PREVIOUS_KEYS),
+    cache_size=settings.AUTH_TOKEN_CACHE_SIZE,
+    revocation_refresh_seconds=settings.AUTH_REVOCATION_REFRESH_SECONDS,
+)
+
+key_reloader = KeyReloader(
+    token_verifier,
+    env_file=Settings.model_config.get("env_file"),
+    refresh_seconds=settings.AUTH_KEYS_REFRESH_SECONDS,
+)
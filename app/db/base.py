@@ -6,4 +6,7 @@ class Base(DeclarativeBase):
 from app.models.calendar_day import CalendarDay
 from app.models.timetable_version import TimetableVersion
 from app.models.timetable_entry import TimetableEntry
-from app.models.class_session import ClassSession
\ No newline at end of file
+from app.models.class_session import ClassSession
+from app.models.data_revision import DataRevision
+from app.models.revoked_token import RevokedToken
+from app.models.runtime_setting import RuntimeSetting
\ No newline at end of file
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import io
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _copy_text_value(value: Any) -> str:
+    # formato "text" do COPY: \N = NULL, e escapa \ tab e quebras de linha
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    s = str(value)
+    if any(ch in s for ch in "\\\t\n\r"):
+        s = s.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return s
+
+
+def _copy_batch(db: Session, table: Table, columns: Sequence[str], batch: List[Dict[str, Any]]) -> None:
+    buf = io.StringIO()
+    for row in batch:
+        buf.write("\t".join(_copy_text_value(row.get(c)) for c in columns))
+        buf.write("\n")
+    buf.seek(0)
+
+    # mesma conexão (e transação) da Session
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN",
+            buf,
+        )
+    finally:
+        cursor.close()
+
+
+def copy_rows(
+    db: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Insere `rows` (dicts já normalizados) em lote, sem criar objetos ORM.
+
+    Em Postgres (psycopg2) usa COPY FROM STDIN; nos outros drivers cai
+    num INSERT executemany (insertmanyvalues do SQLAlchemy). Não faz
+    commit: tudo roda na transação corrente da Session.
+    """
+    driver = db.get_bind().dialect.driver
+    total = 0
+    for batch in _batches(rows, batch_size):
+        if driver == "psycopg2":
+            _copy_batch(db, table, columns, batch)
+        else:
+            db.execute(insert(table), [{c: r.get(c) for c in columns} for r in batch])
+        total += len(batch)
+    return total
+
+
+def upsert_insert(db: Session, table):
+    """
+    INSERT com on_conflict_do_update/do_nothing do dialeto da sessão:
+    Postgres em produção, SQLite no stand-in do benchmarks/suite.py (mesma
+    API, incluindo excluded, where e RETURNING).
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(table)
+    return pg_insert(table)
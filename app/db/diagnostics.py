@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import current_request
+
+logger = logging.getLogger("app.db")
+
+# listas de placeholders de tamanho variável (IN (...), VALUES (...), (...)) viram um só
+_PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*(?:%\(\w+\)s|%s|\$\d+|\?|:\w+)\s*,)+\s*(?:%\(\w+\)s|%s|\$\d+|\?|:\w+)\s*\)")
+_SPACES_RE = re.compile(r"\s+")
+
+_MAX_LOGGED_SQL = 2000
+_MAX_LOGGED_PARAMS = 1000
+
+
+def statement_shape(statement: str) -> str:
+    shape = _SPACES_RE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST_RE.sub("(...)", shape)
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class QueryDiagnostics:
+    """
+    Slow query log + detector de N+1 no engine. Os limites mudam em runtime
+    (PUT /diagnostics/db) sem redeploy; 0 desliga cada um. O PUT grava em
+    runtime_settings e cada worker relê a cada refresh_seconds; os contadores
+    são deste processo.
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float = 0,
+        n_plus_one_threshold: int = 0,
+        log_params: bool = False,
+        refresh_seconds: float = 30.0,
+    ) -> None:
+        self._lock = threading.Lock()
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.log_params = log_params
+        self.refresh_seconds = refresh_seconds
+        self.slow_queries = 0
+        self.n_plus_one = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.slow_query_ms > 0 or self.n_plus_one_threshold > 0
+
+    def configure(
+        self,
+        slow_query_ms: float | None = None,
+        n_plus_one_threshold: int | None = None,
+        log_params: bool | None = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            if slow_query_ms is not None:
+                self.slow_query_ms = max(0.0, float(slow_query_ms))
+            if n_plus_one_threshold is not None:
+                self.n_plus_one_threshold = max(0, int(n_plus_one_threshold))
+            if log_params is not None:
+                self.log_params = bool(log_params)
+        return self.status()
+
+    def settings(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "slow_query_ms": self.slow_query_ms,
+                "n_plus_one_threshold": self.n_plus_one_threshold,
+                "log_params": self.log_params,
+            }
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {"slow_queries": self.slow_queries, "n_plus_one": self.n_plus_one}
+        return {**self.settings(), **counters, "pid": os.getpid()}
+
+    # ----------------------------
+    # chamados pelos eventos do engine
+    # ----------------------------
+
+    def after_execute(self, statement: str, parameters: Any, elapsed: float, executemany: bool) -> None:
+        request = current_request.get()
+        route = request.route_label if request is not None else "-"
+
+        if self.slow_query_ms and elapsed * 1000 >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries += 1
+            params = f" params={_clip(repr(parameters), _MAX_LOGGED_PARAMS)}" if self.log_params else ""
+            logger.warning(
+                "slow query %.1fms route=%s sql=%s%s",
+                elapsed * 1000, route, _clip(statement, _MAX_LOGGED_SQL), params,
+            )
+
+        # executemany (lotes do insertmanyvalues, COPY etc.) não é N+1
+        threshold = self.n_plus_one_threshold
+        if threshold and request is not None and not executemany:
+            shape = statement_shape(statement)
+            count = request.shapes.get(shape, 0) + 1
+            request.shapes[shape] = count
+            if count == threshold + 1:
+                with self._lock:
+                    self.n_plus_one += 1
+                logger.warning(
+                    "possible N+1: statement ran more than %d times route=%s sql=%s",
+                    threshold, route, _clip(shape, _MAX_LOGGED_SQL),
+                )
+
+    def install(self, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if self.enabled:
+                conn.info.setdefault("_diagnostics_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            stack = conn.info.get("_diagnostics_started")
+            if stack:
+                # ligado no meio do statement: o before não empilhou, ignora
+                self.after_execute(statement, parameters, time.perf_counter() - stack.pop(), executemany)
+
+        @event.listens_for(engine, "handle_error")
+        def _error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("_diagnostics_started"):
+                conn.info["_diagnostics_started"].pop()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.data_revision import DataRevision
+
+
+def get_revision(db: Session, scope: str, compute: Callable[[], str] | None = None) -> str | None:
+    """
+    Revisão atual de um escopo. Se ainda não existe e `compute` foi passado,
+    devolve o valor calculado sem gravar: leitura não escreve (réplica
+    read-only, GETs concorrentes). Quem grava são os imports e a migration
+    8c3f21d6e5a7, que preenche os escopos existentes.
+    """
+    rev = db.execute(
+        select(DataRevision.revision).where(DataRevision.scope == scope)
+    ).scalar_one_or_none()
+    if rev is None and compute is not None:
+        rev = compute()
+    return rev
+
+
+def set_revision(db: Session, scope: str, revision: str) -> None:
+    """Grava a revisão na sessão atual (o commit fica com quem chamou)."""
+    row = db.get(DataRevision, scope)
+    if row is None:
+        db.add(DataRevision(scope=scope, revision=revision))
+    else:
+        row.revision = revision
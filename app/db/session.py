@@ -1,13 +1,108 @@
+from typing import Any, Callable, TypeVar, Union
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db.diagnostics import QueryDiagnostics
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+
+def engine_options(url: str, poolclass: type) -> dict[str, Any]:
+    """Pool e statement_timeout vindos do Settings (DB_POOL_*, DB_STATEMENT_TIMEOUT_MS)."""
+    options: dict[str, Any] = {
+        "pool_pre_ping": True,
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    parsed = make_url(url)
+    if timeout_ms > 0 and parsed.get_backend_name() == "postgresql":
+        # vale para a sessão inteira da conexão; o servidor cancela o statement
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# slow query log + detector de N+1 (limites mudam em runtime, ver routes/diagnostics.py)
+diagnostics = QueryDiagnostics(
+    slow_query_ms=settings.DB_SLOW_QUERY_MS,
+    n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD,
+    log_params=settings.DB_LOG_QUERY_PARAMS,
+    refresh_seconds=settings.DB_DIAGNOSTICS_REFRESH_SECONDS,
+)
+diagnostics.install(engine)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ----------------------------
+# Async (opt-in: DB_ASYNC=true)
+# ----------------------------
+
+def async_database_url() -> str:
+    """ASYNC_DATABASE_URL ou o DATABASE_URL trocando o driver para asyncpg."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_database_url(), **engine_options(async_database_url(), InstrumentedAsyncQueuePool)
+    )
+    # expire_on_commit=False: nada de lazy load (IO) depois do commit fora do greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    diagnostics.install(async_engine.sync_engine)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# dependência usada pelas rotas: AsyncSession com DB_ASYNC, Session síncrona sem
+get_session = get_async_db if settings.DB_ASYNC else get_db
+AnySession = Union[Session, AsyncSession]
+
+T = TypeVar("T")
+
+
+async def run_db(db: AnySession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Roda `fn(session, *args)` (código SQLAlchemy síncrono) a partir de uma
+    rota async:
+      - AsyncSession: via run_sync, no event loop, sem ocupar thread;
+        a concorrência fica limitada pelo pool de conexões.
+      - Session síncrona: no threadpool do Starlette (comportamento antigo).
+
+    No run_sync, tudo que `fn` faz fora do SQL (parse, diff, encode) roda na
+    thread do event loop e trava os outros requests: `fn` deve só consultar/
+    gravar. CPU fica com run_in_threadpool (ou FastJSONResponse, que serializa
+    payload grande no envio); imports e o índice de dias letivos ficam sempre
+    na Session síncrona (get_db).
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+    return await db.run_sync(fn, *args, **kwargs)
@@ -1,21 +1,34 @@
+import asyncio
 import os
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import select
 
-from app.db.session import SessionLocal
+from app.core.metrics import MetricsMiddleware, gauge_lines, instrument_engine, registry
+from app.db.pool import pool_status
+from app.db.session import SessionLocal, async_engine, diagnostics, engine
 from app.models.user import User  # ajuste pro nome real do seu model
+from app.services.db_diagnostics import refresh_loop
 
 from app.api.routes.users import router as users_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.calendar import router as calendar_router
 from app.api.routes.timetable import router as timetable_router
+from app.api.routes.diagnostics import router as diagnostics_router
 
 app = FastAPI(title="InovAulas API", version="0.1.0")
 
+# latência/status/in-flight por rota + SQL (statements e tempo) de cada request
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+
 app.include_router(users_router)
 app.include_router(auth_router)
 app.include_router(calendar_router)
 app.include_router(timetable_router)
+app.include_router(diagnostics_router)
 
 @app.on_event("startup")
 def ensure_bootstrap_user():
@@ -35,6 +48,43 @@ def ensure_bootstrap_user():
     finally:
         db.close()
 
+# limites do PUT /diagnostics/db (feito em qualquer worker) relidos em background
+_diagnostics_task: asyncio.Task | None = None
+
+@app.on_event("startup")
+async def start_diagnostics_refresh():
+    global _diagnostics_task
+    if diagnostics.refresh_seconds > 0:
+        _diagnostics_task = asyncio.create_task(refresh_loop(diagnostics))
+
+@app.on_event("shutdown")
+async def stop_diagnostics_refresh():
+    if _diagnostics_task is not None:
+        _diagnostics_task.cancel()
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/pool")
+def health_pool():
+    # pool esgotado (checked_out = size + max_overflow, wait/timeouts subindo) vs query lenta
+    return _pools()
+
+def _pools():
+    pools = {"sync": pool_status(engine.pool)}
+    if async_engine is not None:
+        pools["async"] = pool_status(async_engine.sync_engine.pool)
+    return pools
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    pools = _pools()
+    extra = []
+    for field in ("checked_out", "overflow", "wait_seconds_total", "timeouts"):
+        extra += gauge_lines(
+            f"db_pool_{field}",
+            f"Pool de conexões: {field}.",
+            [({"pool": name}, status[field]) for name, status in pools.items() if field in status],
+        )
+    return PlainTextResponse(registry.render(extra), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -1,5 +1,8 @@
 from .user import User  # noqa
 from .timetable_version import TimetableVersion  # noqa
 from .timetable_entry import TimetableEntry  # noqa
+from .data_revision import DataRevision  # noqa
+from .revoked_token import RevokedToken  # noqa
+from .runtime_setting import RuntimeSetting  # noqa
 
-__all__ = ["User", "TimetableVersion", "TimetableEntry"]
\ No newline at end of file
+__all__ = ["User", "TimetableVersion", "TimetableEntry", "DataRevision", "RevokedToken", "RuntimeSetting"]
\ No newline at end of file
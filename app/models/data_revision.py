@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+class DataRevision(Base):
+    __tablename__ = "data_revisions"
+
+    # ex.: "calendar", "timetable_versions"
+    scope: Mapped[str] = mapped_column(String(40), primary_key=True)
+
+    # hash do conteúdo; muda sempre que um import altera dados desse escopo
+    revision: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
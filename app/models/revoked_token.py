@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # jti do token (ou sha256 truncado, para tokens antigos sem jti)
+    token_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    # depois do exp o token já não vale; a linha pode ser apagada
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
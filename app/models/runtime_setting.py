@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+class RuntimeSetting(Base):
+    __tablename__ = "runtime_settings"
+
+    # ex.: "db_diagnostics"
+    key: Mapped[str] = mapped_column(String(40), primary_key=True)
+
+    # valores ajustados em runtime; cada worker relê periodicamente
+    value: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
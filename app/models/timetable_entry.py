@@ -1,5 +1,5 @@
 # app/models/timetable_entry.py
-from sqlalchemy import ForeignKey, Integer, String, SmallInteger
+from sqlalchemy import ForeignKey, Index, Integer, String, SmallInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -7,6 +7,17 @@ from app.models.timetable_version import TimetableVersion
 
 class TimetableEntry(Base):
     __tablename__ = "timetable_entries"
+    __table_args__ = (
+        # busca "contém" (LIKE '%x%') sem seq scan: pg_trgm
+        Index(
+            "ix_timetable_entries_teacher_search_trgm", "teacher_search",
+            postgresql_using="gin", postgresql_ops={"teacher_search": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_timetable_entries_room_search_trgm", "room_search",
+            postgresql_using="gin", postgresql_ops={"room_search": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
@@ -35,4 +46,8 @@ class TimetableEntry(Base):
     room_code: Mapped[str | None] = mapped_column(String(120), nullable=True)
     room_name: Mapped[str | None] = mapped_column(String(120), nullable=True, index=True)
 
+    # chaves de busca: minúsculas e sem acento ("Conceição" -> "conceicao")
+    teacher_search: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    room_search: Mapped[str | None] = mapped_column(String(120), nullable=True)
+
     timetable_version: Mapped[TimetableVersion] = relationship()
\ No newline at end of file
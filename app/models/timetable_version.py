@@ -1,5 +1,5 @@
 from datetime import date
-from sqlalchemy import Date, Integer, String
+from sqlalchemy import JSON, Date, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
@@ -14,4 +14,10 @@ class TimetableVersion(Base):
     end_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
 
     source: Mapped[str | None] = mapped_column(String(40), nullable=True)
-    note: Mapped[str | None] = mapped_column(String(255), nullable=True)
\ No newline at end of file
+    note: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # listas únicas (class_codes/courses/teachers/rooms) calculadas no import
+    filters_catalog: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True)
+
+    # hash do conteúdo das entries (vira ETag); recalculado a cada import
+    revision: Mapped[str | None] = mapped_column(String(64), nullable=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from app.db.base import Base
 
 class User(Base):
@@ -6,4 +6,11 @@ class User(Base):
     id = Column(Integer, primary_key=True)
     username = Column(String(50), unique=True, nullable=False)
     full_name = Column(String(120), nullable=True)
-    role = Column(String(30), nullable=False)  # admin, cotep, professor, aluno...
\ No newline at end of file
+    role = Column(String(30), nullable=False)  # admin, cotep, professor, aluno...
+
+    __table_args__ = (
+        # GET /users?role=...&after=... (keyset por id dentro do papel)
+        Index("ix_users_role_id", "role", "id"),
+        # username_prefix: LIKE 'abc%' só usa btree com *_pattern_ops fora do locale C
+        Index("ix_users_username_prefix", "username", postgresql_ops={"username": "varchar_pattern_ops"}),
+    )
\ No newline at end of file
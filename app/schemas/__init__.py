@@ -1 +1 @@
-from .user import UserCreate, UserUpdate, UserOut  # noqa
\ No newline at end of file
+from .user import UserBulkResult, UserCreate, UserListItem, UserUpdate, UserOut  # noqa
\ No newline at end of file
@@ -5,4 +5,7 @@ class LoginIn(BaseModel):
 
 class LoginOut(BaseModel):
     access_token: str
-    token_type: str = "bearer"
\ No newline at end of file
+    token_type: str = "bearer"
+
+class RevokeIn(BaseModel):
+    token: str = Field(..., min_length=1)
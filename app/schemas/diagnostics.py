@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+class DbDiagnosticsIn(BaseModel):
+    # None = mantém o valor atual; 0 desliga
+    slow_query_ms: float | None = Field(default=None, ge=0)
+    n_plus_one_threshold: int | None = Field(default=None, ge=0)
+    log_params: bool | None = None
+
+
+class DbDiagnosticsOut(BaseModel):
+    slow_query_ms: float
+    n_plus_one_threshold: int
+    log_params: bool
+    slow_queries: int
+    n_plus_one: int
+    # contadores são por processo
+    pid: int
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel):
     username: str = Field(..., max_length=50)
@@ -17,4 +17,20 @@ class UserOut(UserBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# GET /users: só id é garantido; os outros vêm conforme ?fields=
+class UserListItem(BaseModel):
+    id: int
+    username: Optional[str] = None
+    full_name: Optional[str] = None
+    role: Optional[str] = None
+
+class UserBulkResult(BaseModel):
+    total: int
+    inserted: int
+    updated: int
+    # já existiam (on_conflict=skip) ou já estavam iguais (on_conflict=update)
+    conflicts: List[str]
+    # usernames repetidos no próprio payload (o último vence)
+    duplicates: List[str]
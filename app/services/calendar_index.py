@@ -0,0 +1,166 @@
+# app/services/calendar_index.py
+"""
+Índice em memória dos dias letivos (calendar_days).
+
+Um bitmap de 1 bit por dia + somas de prefixo + posições dos dias letivos
+respondem em O(1):
+  - "é dia letivo?"
+  - "quantos dias letivos entre A e B?"
+  - "qual o N-ésimo dia letivo a partir de X / do SEMESTRE_II?"
+  - "X + N dias letivos"
+
+O índice é reconstruído quando a revisão do calendário muda (import_calendar).
+"""
+from __future__ import annotations
+
+import re
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.calendar_day import CalendarDay
+
+# a observação vem como "SEMESTRE_I" ou "Carnaval | SEMESTRE_I" (build_calendar_2026)
+_TERM_RE = re.compile(r"\b(SEMESTRE_[A-Z0-9]+)\b")
+
+
+class CalendarIndex:
+    def __init__(self, rows: Iterable[Tuple[date, bool, str | None]], revision: str | None = None):
+        rows = sorted(rows, key=lambda r: r[0])
+        self.revision = revision
+
+        if rows:
+            self.start: date | None = rows[0][0]
+            self.end: date | None = rows[-1][0]
+            size = (self.end - self.start).days + 1
+        else:
+            self.start = self.end = None
+            size = 0
+
+        self._size = size
+        self._bits = bytearray((size + 7) // 8)
+        terms: Dict[str, List[date]] = {}
+
+        for day, is_school_day, note in rows:
+            i = (day - self.start).days
+            if is_school_day:
+                self._bits[i >> 3] |= 1 << (i & 7)
+            for term in _TERM_RE.findall(note or ""):
+                span = terms.setdefault(term, [day, day])
+                span[0] = min(span[0], day)
+                span[1] = max(span[1], day)
+
+        # prefix[i] = dias letivos em [start, start + i)
+        self._prefix = array("I", [0]) * (size + 1)
+        # positions[k] = offset (em dias) do k-ésimo dia letivo (0-based)
+        self._positions = array("I")
+        acc = 0
+        for i in range(size):
+            if self._bits[i >> 3] & (1 << (i & 7)):
+                self._positions.append(i)
+                acc += 1
+            self._prefix[i + 1] = acc
+
+        self.terms: Dict[str, Tuple[date, date]] = {t: (a, b) for t, (a, b) in terms.items()}
+
+    # ----------------------------
+    # internos
+    # ----------------------------
+
+    def _offset(self, day: date) -> int:
+        """Offset de `day` recortado para [0, size]."""
+        if self.start is None:
+            return 0
+        return min(max((day - self.start).days, 0), self._size)
+
+    def _day_at(self, position: int) -> date | None:
+        if 0 <= position < len(self._positions):
+            return self.start + timedelta(days=self._positions[position])
+        return None
+
+    # ----------------------------
+    # consultas
+    # ----------------------------
+
+    @property
+    def school_days_total(self) -> int:
+        return len(self._positions)
+
+    def is_school_day(self, day: date) -> bool:
+        if self.start is None or not (self.start <= day <= self.end):
+            return False
+        i = (day - self.start).days
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def count_between(self, first: date, last: date) -> int:
+        """Dias letivos em [first, last] (inclusive)."""
+        if self.start is None or last < first:
+            return 0
+        return self._prefix[self._offset(last + timedelta(days=1))] - self._prefix[self._offset(first)]
+
+    def nth_school_day(self, n: int, start: date | None = None) -> date | None:
+        """N-ésimo (1-based) dia letivo contando a partir de `start` (inclusive)."""
+        if n < 1 or self.start is None:
+            return None
+        before = self._prefix[self._offset(start)] if start else 0
+        return self._day_at(before + n - 1)
+
+    def nth_school_day_of_term(self, n: int, term: str) -> date | None:
+        span = self.terms.get(term)
+        if not span:
+            return None
+        day = self.nth_school_day(n, span[0])
+        return day if day and day <= span[1] else None
+
+    def add_school_days(self, day: date, n: int) -> date | None:
+        """
+        `day` + N dias letivos (N < 0 volta). N=0 devolve o próprio dia.
+        None se o resultado cai fora do calendário carregado.
+        """
+        if n == 0:
+            return day
+        if self.start is None:
+            return None
+        if n > 0:
+            # dias letivos até `day` inclusive; o próximo é o índice seguinte
+            upto = self._prefix[self._offset(day + timedelta(days=1))]
+            return self._day_at(upto + n - 1)
+        before = self._prefix[self._offset(day)]
+        return self._day_at(before + n)
+
+
+class CalendarIndexHolder:
+    """Guarda o índice do processo e reconstrói quando a revisão muda."""
+
+    def __init__(self) -> None:
+        self._index: CalendarIndex | None = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._index = None
+
+    def get(self, db: Session, revision: str | None) -> CalendarIndex:
+        index = self._index
+        if index is not None and index.revision == revision:
+            return index
+
+        # query + build fora do lock: sob run_sync (DB_ASYNC) um lock preso
+        # durante o await da query trava o event loop inteiro. Dois requests
+        # podem montar o mesmo índice; o lock só protege a publicação.
+        rows = db.execute(
+            select(CalendarDay.day, CalendarDay.is_school_day, CalendarDay.note)
+        ).all()
+        built = CalendarIndex(rows, revision=revision)
+        with self._lock:
+            current = self._index
+            if current is not None and current.revision == revision:
+                return current
+            self._index = built
+        return built
+
+
+calendar_index = CalendarIndexHolder()
@@ -0,0 +1,166 @@
+# app/services/class_sessions.py
+"""
+Materialização das aulas (class_sessions) a partir de horário × calendário.
+
+Cada entry de uma TimetableVersion vira uma aula "prevista" em todo dia
+letivo (calendar_days.is_school_day) do mesmo dia da semana dentro de
+start_date..end_date da versão. Tudo roda como DELETE + INSERT ... SELECT
+no banco, sem loop em Python por dia.
+
+Aulas que já saíram de "prevista" (realizada, cancelada, reposta...) nunca
+são apagadas nem duplicadas pela regeneração.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date
+from typing import Dict, Iterable
+
+from sqlalchemy import and_, delete, exists, extract, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.calendar_day import CalendarDay
+from app.models.class_session import ClassSession
+from app.models.timetable import TimetableEntry, TimetableVersion
+
+logger = logging.getLogger("app.sessions")
+
+GENERATED_STATUS = "prevista"
+
+# colunas copiadas da entry para a aula
+_COPIED_COLUMNS = (
+    "group_code", "class_code", "weekday", "slot",
+    "subject_code", "subject_name",
+    "teacher_username", "teacher_name",
+    "room_code", "room_name",
+)
+
+
+def materialize_sessions(
+    db: Session,
+    tv: TimetableVersion,
+    days: Iterable[date] | None = None,
+    weekdays: Iterable[int] | None = None,
+    first: date | None = None,
+    last: date | None = None,
+) -> Dict[str, int]:
+    """
+    Regenera as aulas previstas da versão. Sem filtros refaz a versão
+    inteira; `days`, `weekdays` e `first`/`last` limitam o escopo (só as
+    datas/dias da semana afetados por uma mudança). Não faz commit.
+    """
+    if (first and first < tv.start_date) or (last and last > tv.end_date):
+        logger.info(
+            "materialize %s: range clamped to the version period %s..%s",
+            tv.code, tv.start_date, tv.end_date,
+        )
+    first = max(first, tv.start_date) if first else tv.start_date
+    last = min(last, tv.end_date) if last else tv.end_date
+    days = sorted(set(days)) if days is not None else None
+    weekdays = sorted(set(weekdays)) if weekdays is not None else None
+
+    if last < first or days == [] or weekdays == []:
+        return {"deleted": 0, "inserted": 0}
+
+    # 1) apaga as previstas do escopo
+    scope = [
+        ClassSession.timetable_version_id == tv.id,
+        ClassSession.status == GENERATED_STATUS,
+        ClassSession.day.between(first, last),
+    ]
+    if days is not None:
+        scope.append(ClassSession.day.in_(days))
+    if weekdays is not None:
+        scope.append(ClassSession.weekday.in_(weekdays))
+
+    deleted = db.execute(delete(ClassSession).where(*scope)).rowcount
+
+    # 2) INSERT ... SELECT: entries × dias letivos do mesmo dia da semana
+    #    isodow: 1=segunda ... 7=domingo; weekday: 0=segunda ... 6=domingo
+    e = TimetableEntry
+    cd = CalendarDay
+    kept = aliased(ClassSession)
+
+    source = (
+        select(
+            cd.day,
+            literal(tv.id),
+            *(getattr(e, c) for c in _COPIED_COLUMNS),
+            literal(GENERATED_STATUS),
+        )
+        .select_from(e)
+        .join(
+            cd,
+            and_(
+                cd.is_school_day.is_(True),
+                extract("isodow", cd.day) - 1 == e.weekday,
+                cd.day.between(first, last),
+            ),
+        )
+        .where(e.timetable_version_id == tv.id)
+        # aula já tratada (realizada/cancelada/...) não é gerada de novo
+        .where(
+            ~exists().where(
+                kept.timetable_version_id == tv.id,
+                kept.day == cd.day,
+                kept.group_code == e.group_code,
+                kept.slot == e.slot,
+                kept.subject_code == e.subject_code,
+            )
+        )
+    )
+    if days is not None:
+        source = source.where(cd.day.in_(days))
+    if weekdays is not None:
+        source = source.where(e.weekday.in_(weekdays))
+
+    inserted = db.execute(
+        insert(ClassSession).from_select(
+            ["day", "timetable_version_id", *_COPIED_COLUMNS, "status"],
+            source,
+        )
+    ).rowcount
+
+    return {"deleted": deleted, "inserted": inserted}
+
+
+def drop_sessions_outside_period(db: Session, tv: TimetableVersion) -> int:
+    """Depois de mudar start_date/end_date: apaga as previstas que ficaram fora. Não faz commit."""
+    return db.execute(
+        delete(ClassSession).where(
+            ClassSession.timetable_version_id == tv.id,
+            ClassSession.status == GENERATED_STATUS,
+            ~ClassSession.day.between(tv.start_date, tv.end_date),
+        )
+    ).rowcount
+
+
+def materialize_calendar_changes(db: Session, changed_days: Iterable[date]) -> Dict[str, int]:
+    """
+    Depois de um import_calendar: refaz só os dias alterados, em todas as
+    versões cujo período cobre esses dias. Não faz commit.
+    """
+    changed_days = sorted(set(changed_days))
+    totals = {"deleted": 0, "inserted": 0}
+    if not changed_days:
+        return totals
+
+    versions = db.execute(
+        select(TimetableVersion)
+        .where(TimetableVersion.start_date <= changed_days[-1])
+        .where(TimetableVersion.end_date >= changed_days[0])
+    ).scalars().all()
+
+    # dia fora da vigência de toda versão não gera aula: avisa em vez de sumir calado
+    uncovered = [d for d in changed_days if not any(tv.start_date <= d <= tv.end_date for tv in versions)]
+    if uncovered:
+        logger.warning(
+            "%d calendar day(s) outside every timetable version period (%s..%s): no sessions generated",
+            len(uncovered), uncovered[0], uncovered[-1],
+        )
+
+    for tv in versions:
+        result = materialize_sessions(db, tv, days=changed_days)
+        totals["deleted"] += result["deleted"]
+        totals["inserted"] += result["inserted"]
+    return totals
@@ -0,0 +1,66 @@
+# app/services/db_diagnostics.py
+"""
+Limites do diagnóstico do engine (slow query / N+1) compartilhados entre
+workers: o PUT /diagnostics/db grava a linha "db_diagnostics" em
+runtime_settings e cada worker relê numa task de background (refresh_loop,
+iniciada no startup), sem passar pelos requests.
+Sem linha, valem as env vars DB_SLOW_QUERY_MS etc.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from sqlalchemy.orm import Session
+
+from app.db.diagnostics import QueryDiagnostics
+from app.db.session import SessionLocal
+from app.models.runtime_setting import RuntimeSetting
+
+logger = logging.getLogger("app.db")
+
+SETTING_KEY = "db_diagnostics"
+
+
+def load_diagnostics(db: Session, diagnostics: QueryDiagnostics) -> bool:
+    row = db.get(RuntimeSetting, SETTING_KEY)
+    if row is None:
+        return False
+    diagnostics.configure(**row.value)
+    return True
+
+
+def refresh_diagnostics(diagnostics: QueryDiagnostics) -> bool:
+    """Recarrega numa sessão própria (fora de rota)."""
+    db = SessionLocal()
+    try:
+        return load_diagnostics(db, diagnostics)
+    finally:
+        db.close()
+
+
+async def refresh_loop(diagnostics: QueryDiagnostics) -> None:
+    """Relê a cada diagnostics.refresh_seconds até ser cancelada (shutdown)."""
+    while True:
+        try:
+            await run_in_threadpool(refresh_diagnostics, diagnostics)
+        except Exception:
+            # banco fora do ar ou sem a migration: segue com os limites atuais
+            logger.exception("could not refresh db diagnostics settings")
+        await asyncio.sleep(diagnostics.refresh_seconds)
+
+
+def save_diagnostics(db: Session, diagnostics: QueryDiagnostics, changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Grava os limites (None = mantém) e aplica neste worker. Faz commit."""
+    row = db.get(RuntimeSetting, SETTING_KEY)
+    value = dict(row.value) if row is not None else diagnostics.settings()
+    value.update({k: v for k, v in changes.items() if v is not None})
+    if row is None:
+        db.add(RuntimeSetting(key=SETTING_KEY, value=value))
+    else:
+        row.value = value
+    db.commit()
+    return diagnostics.configure(**value)
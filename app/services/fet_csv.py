@@ -0,0 +1,94 @@
+# app/services/fet_csv.py
+"""
+Parsing do CSV exportado pelo FET (Day/Hour/Students Sets/Subject/Teachers/Room).
+
+Só usa stdlib: é importado tanto pela API (upload do CSV cru) quanto pelos
+scripts de sync.
+"""
+from __future__ import annotations
+
+import csv
+import re
+from typing import Any, Dict, Iterable, Iterator
+
+
+def norm(s: Any) -> str:
+    return ("" if s is None else str(s)).strip()
+
+
+_WEEKDAY_MAP = {
+    # 0 = Monday
+    "segunda": 0, "segunda-feira": 0, "seg": 0,
+    "terca": 1, "terça": 1, "terça-feira": 1, "terca-feira": 1, "ter": 1,
+    "quarta": 2, "quarta-feira": 2, "qua": 2,
+    "quinta": 3, "quinta-feira": 3, "qui": 3,
+    "sexta": 4, "sexta-feira": 4, "sex": 4,
+    "sabado": 5, "sábado": 5, "sábado-feira": 5, "sab": 5,
+    "domingo": 6, "dom": 6,
+}
+
+def parse_weekday(day_raw: str) -> int | None:
+    d = norm(day_raw).lower()
+    d = d.replace("feira", "feira")  # noop só pra ficar explícito
+    d = d.replace("  ", " ").strip()
+    # exemplos seus: "Sexta feira", "Quarta-feira"
+    d = d.replace(" feira", "-feira")
+    d = d.replace("--", "-")
+    d = d.replace("á", "a").replace("ã", "a").replace("ç", "c").replace("é", "e").replace("ê", "e").replace("í", "i").replace("ó", "o").replace("ô", "o").replace("ú", "u")
+    return _WEEKDAY_MAP.get(d)
+
+
+_SLOT_RE = re.compile(r"^(\d{1,2})h(\d{2})-(\d{1,2})h(\d{2})$")
+
+def parse_slot(hour_raw: str) -> str | None:
+    """
+    Aceita coisas tipo:
+      - 07h30-8h20min
+      - 8h20-9h10min
+      - 14h10-15h00min
+    Converte para:
+      - 07:30-08:20
+      - 08:20-09:10
+      - 14:10-15:00
+    """
+    s = norm(hour_raw).lower()
+    s = s.replace("min", "").replace(" ", "")
+    # pega "07h30-8h20" etc
+    m = _SLOT_RE.match(s)
+    if not m:
+        return None
+    h1, m1, h2, m2 = m.groups()
+    return f"{int(h1):02d}:{int(m1):02d}-{int(h2):02d}:{int(m2):02d}"
+
+
+def iter_fet_rows(lines: Iterable[str], timetable_code: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lê o CSV "cru" linha a linha e devolve dicts no formato aceito pelo
+    POST /timetable/import. Linhas inválidas são puladas.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        day = norm(row.get("Day"))
+        hour = norm(row.get("Hour"))
+        group = norm(row.get("Students Sets"))
+        subject = norm(row.get("Subject"))
+        teacher = norm(row.get("Teachers"))
+        room = norm(row.get("Room"))
+
+        weekday = parse_weekday(day)
+        slot = parse_slot(hour)
+
+        if weekday is None or slot is None or not group:
+            # pula linha inválida (mas não mata o processo)
+            continue
+
+        yield {
+            "timetable_code": timetable_code,
+            "weekday": weekday,
+            "slot": slot,
+            "group_code": group,
+            # pode mandar subject_code/teacher_username, mas sua API também aceita *_name
+            "subject_name": subject,
+            "teacher_name": teacher,
+            "room": room or None,
+        }
@@ -0,0 +1,90 @@
+# app/services/timetable_conflicts.py
+"""
+Detecção de choques de horário numa versão: o mesmo professor, sala ou
+turma (group_code, ou seja, o subgrupo do FET) em duas entries no mesmo
+(weekday, slot).
+
+Um passe só sobre as entries, com um dict por recurso indexado por
+(recurso, weekday, slot): O(n), sem self-join no banco.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.timetable import TimetableEntry
+
+# recurso -> como achar a chave e o nome legível na entry
+RESOURCES = ("teacher", "room", "class")
+
+_COLUMNS = (
+    "id", "weekday", "slot", "group_code", "class_code",
+    "subject_name", "teacher_username", "teacher_name", "room_code", "room_name",
+)
+
+
+def _resource_keys(e: Mapping[str, Any]):
+    yield "teacher", e["teacher_username"], e["teacher_name"]
+    yield "room", e["room_code"], e["room_name"]
+    # chave = Students Set bruto do FET: subgrupos da mesma turma (mesmo class_code,
+    # group_code diferente) dividem o horário de propósito e não são choque
+    yield "class", e["group_code"], e["group_code"]
+
+
+def find_conflicts(entries: Iterable[Mapping[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    index: Dict[str, Dict[tuple, List[Mapping[str, Any]]]] = {r: {} for r in RESOURCES}
+    names: Dict[tuple, str | None] = {}
+
+    for e in entries:
+        for resource, key, name in _resource_keys(e):
+            if not key:
+                continue
+            k = (key, e["weekday"], e["slot"])
+            index[resource].setdefault(k, []).append(e)
+            names.setdefault((resource, key), name)
+
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for resource in RESOURCES:
+        groups = [
+            {
+                "resource": key,
+                "name": names[(resource, key)],
+                "weekday": weekday,
+                "slot": slot,
+                "entries": [
+                    {
+                        "id": e["id"],
+                        "class_code": e["class_code"],
+                        "group_code_raw": e["group_code"],
+                        "subject_name": e["subject_name"],
+                        "teacher_name": e["teacher_name"],
+                        "room_name": e["room_name"],
+                    }
+                    for e in items
+                ],
+            }
+            for (key, weekday, slot), items in index[resource].items()
+            if len(items) > 1
+        ]
+        groups.sort(key=lambda g: (str(g["resource"]), g["weekday"], g["slot"]))
+        out[resource] = groups
+    return out
+
+
+def conflict_rows(db: Session, timetable_version_id: int) -> List[Mapping[str, Any]]:
+    """Só as colunas que o find_conflicts usa (o passe em Python pode rodar fora da sessão)."""
+    return db.execute(
+        select(*(getattr(TimetableEntry, c) for c in _COLUMNS))
+        .where(TimetableEntry.timetable_version_id == timetable_version_id)
+    ).mappings().all()
+
+
+def version_conflicts(db: Session, timetable_version_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Carrega só as colunas necessárias da versão e roda find_conflicts."""
+    return find_conflicts(conflict_rows(db, timetable_version_id))
+
+
+def conflict_counts(conflicts: Mapping[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    return {resource: len(groups) for resource, groups in conflicts.items()}
@@ -0,0 +1,332 @@
+# app/services/timetable_import.py
+from __future__ import annotations
+
+import re
+import unicodedata
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Mapping
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.etag import RevisionHasher
+from app.db.bulk import copy_rows
+from app.models.calendar_day import CalendarDay
+from app.models.timetable import TimetableEntry, TimetableVersion
+
+
+# ----------------------------
+# Helpers (turma/código/curso)
+# ----------------------------
+
+_CLASS_CODE_RE = re.compile(r"\((\d+\.\d+\.\d+[A-Za-z])\)")
+
+def extract_class_code(group_code: str | None) -> str | None:
+    """
+    Extrai '1.18.1I' de strings como:
+      '1º INFOR_M(1.18.1I) sala-03'
+    """
+    if not group_code:
+        return None
+    m = _CLASS_CODE_RE.search(group_code)
+    return m.group(1).upper() if m else None
+
+
+def course_from_class_code(class_code: str | None) -> str | None:
+    """
+    Regra: x.18.y = Informática | x.28.y = Meio Ambiente
+    """
+    if not class_code:
+        return None
+    parts = class_code.split(".")
+    if len(parts) < 2:
+        return None
+    return {"18": "Informática", "28": "Meio Ambiente"}.get(parts[1])
+
+
+def slugify(text: str | None) -> str:
+    s = (text or "").strip().lower()
+    s = re.sub(r"[^\w\s-]", "", s, flags=re.UNICODE)
+    s = re.sub(r"[\s_-]+", "-", s).strip("-")
+    return s or "unknown"
+
+
+def search_key(text: str | None) -> str | None:
+    """
+    Chave de busca sem acento e sem caixa ("Conceição" -> "conceicao").
+    Gravada no import e usada nos filtros teacher/room (índice pg_trgm).
+    """
+    if not text:
+        return None
+    s = unicodedata.normalize("NFKD", str(text))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.casefold().split()) or None
+
+
+# ----------------------------
+# Normalização (payload -> colunas)
+# ----------------------------
+
+# colunas gravadas em timetable_entries (além do timetable_version_id);
+# também são as que entram no hash de conteúdo da versão
+ENTRY_COLUMNS = (
+    "weekday", "slot", "group_code", "class_code", "course_name",
+    "subject_code", "subject_name", "teacher_username", "teacher_name",
+    "room_code", "room_name",
+)
+
+# derivadas dos nomes; gravadas mas fora do hash de conteúdo
+SEARCH_COLUMNS = ("teacher_search", "room_search")
+WRITE_COLUMNS = ENTRY_COLUMNS + SEARCH_COLUMNS
+
+
+def normalize_entry(row: Mapping[str, Any]) -> Dict[str, Any] | None:
+    """
+    Converte uma linha do payload (formato do sync_timetable_from_r2) nas
+    colunas de TimetableEntry. Devolve None para linha inválida.
+    """
+    weekday = row.get("weekday")
+    slot = row.get("slot")
+    group_code = row.get("group_code")
+
+    subject_name = row.get("subject_name")
+    teacher_name = row.get("teacher_name")
+    room = row.get("room")
+
+    if weekday is None or slot is None or group_code is None:
+        return None
+
+    class_code = extract_class_code(group_code)
+    course_name = course_from_class_code(class_code)
+
+    return {
+        "weekday": int(weekday),
+        "slot": str(slot),
+
+        "group_code": str(group_code),
+        "class_code": class_code,
+        "course_name": course_name,
+
+        "subject_code": slugify(subject_name),
+        "subject_name": subject_name,
+
+        "teacher_username": slugify(teacher_name) if teacher_name else None,
+        "teacher_name": teacher_name,
+
+        "room_code": slugify(room) if room else None,
+        "room_name": str(room) if room else None,
+
+        "teacher_search": search_key(teacher_name),
+        "room_search": search_key(room),
+    }
+
+
+# ----------------------------
+# Catálogo de filtros + revisão
+# ----------------------------
+
+_CATALOG_FIELDS = (
+    ("class_codes", "class_code"),
+    ("courses", "course_name"),
+    ("teachers", "teacher_name"),
+    ("rooms", "room_name"),
+)
+
+
+class FiltersCatalogBuilder:
+    """Acumula as listas únicas do /filters enquanto as linhas passam."""
+
+    def __init__(self) -> None:
+        self._sets: Dict[str, set] = {key: set() for key, _ in _CATALOG_FIELDS}
+
+    def add(self, entry: Mapping[str, Any]) -> None:
+        for key, column in _CATALOG_FIELDS:
+            value = entry[column]
+            if value and value.strip():
+                self._sets[key].add(value)
+
+    def build(self) -> Dict[str, List[str]]:
+        return {key: sorted(values) for key, values in self._sets.items()}
+
+
+def build_filters_catalog(entries: Iterable[Mapping[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Listas únicas e ordenadas (ignorando vazios) que o app usa nos filtros.
+    Calculado uma vez no import e guardado em TimetableVersion.filters_catalog.
+    """
+    builder = FiltersCatalogBuilder()
+    for e in entries:
+        builder.add(e)
+    return builder.build()
+
+
+def add_to_revision(hasher: RevisionHasher, entry: Mapping[str, Any]) -> None:
+    hasher.add(entry[c] for c in ENTRY_COLUMNS)
+
+
+def entries_revision(entries: Iterable[Mapping[str, Any]]) -> str:
+    hasher = RevisionHasher()
+    for e in entries:
+        add_to_revision(hasher, e)
+    return hasher.hexdigest()
+
+
+# ----------------------------
+# Escrita
+# ----------------------------
+
+_CODE_YEAR_RE = re.compile(r"(?<!\d)(20\d{2})(?!\d)")
+
+
+def version_year(code: str) -> int:
+    """Ano letivo da versão pelo código ("tecnico_2026" -> 2026); sem ano no código, o corrente."""
+    m = _CODE_YEAR_RE.search(code)
+    return int(m.group(1)) if m else date.today().year
+
+
+def default_period(db: Session, code: str) -> tuple[date, date]:
+    """
+    Vigência de uma versão nova: os dias do calendário dentro do ano da
+    versão (sem calendário nesse ano, o ano inteiro). Nunca o calendário
+    todo: tecnico_2026 e tecnico_2027 não podem gerar aulas nos mesmos dias.
+    """
+    year = version_year(code)
+    jan1, dec31 = date(year, 1, 1), date(year, 12, 31)
+    first, last = db.execute(
+        select(func.min(CalendarDay.day), func.max(CalendarDay.day))
+        .where(CalendarDay.day.between(jan1, dec31))
+    ).one()
+    if first is None:
+        return jan1, dec31
+    return first, last
+
+
+def get_or_create_version(
+    db: Session,
+    code: str,
+    start: date | None = None,
+    end: date | None = None,
+) -> tuple[TimetableVersion, bool]:
+    tv = db.execute(
+        select(TimetableVersion).where(TimetableVersion.code == code)
+    ).scalar_one_or_none()
+    if tv:
+        return tv, False
+
+    if start is None or end is None:
+        first, last = default_period(db, code)
+        start, end = start or first, end or last
+
+    tv = TimetableVersion(
+        code=code,
+        start_date=start,
+        end_date=end,
+        source="r2",
+        note="import timetable",
+    )
+    db.add(tv)
+    db.flush()
+    return tv, True
+
+
+def set_version_period(tv: TimetableVersion, start: date | None, end: date | None) -> bool:
+    """Aplica start/end informados numa versão existente; True se o período mudou. Não faz commit."""
+    start = start or tv.start_date
+    end = end or tv.end_date
+    if (start, end) == (tv.start_date, tv.end_date):
+        return False
+    tv.start_date, tv.end_date = start, end
+    return True
+
+
+# chave natural de uma entry: o que identifica "a mesma aula" entre dois imports
+KEY_COLUMNS = ("weekday", "slot", "group_code", "subject_code", "teacher_username", "room_code")
+# o resto pode mudar sem virar delete + insert
+VALUE_COLUMNS = tuple(c for c in WRITE_COLUMNS if c not in KEY_COLUMNS)
+
+_DELETE_CHUNK = 5000
+
+
+def copy_entries(db: Session, timetable_version_id: int, entries: Iterable[Dict[str, Any]]) -> int:
+    """
+    Grava entries já normalizadas (normalize_entry) na versão via copy_rows,
+    com todas as WRITE_COLUMNS (inclusive as chaves de busca). Não faz commit.
+    """
+    def rows() -> Iterator[Dict[str, Any]]:
+        for e in entries:
+            e["timetable_version_id"] = timetable_version_id
+            yield e
+
+    return copy_rows(db, TimetableEntry.__table__, ("timetable_version_id", *WRITE_COLUMNS), rows())
+
+
+def sync_entries(db: Session, tv: TimetableVersion, entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aplica na versão só a diferença entre as entries atuais e as recebidas
+    (chave natural KEY_COLUMNS): insere as novas via COPY, atualiza as que
+    mudaram em VALUE_COLUMNS e apaga as que sumiram. Ids das entries que
+    não mudaram são preservados. Recalcula filters_catalog/revision no
+    mesmo passe. Não faz commit.
+
+    Memória: O(entries já gravadas); as recebidas passam em streaming.
+    """
+    existing: Dict[tuple, List[tuple]] = {}
+    for row in db.execute(
+        select(TimetableEntry.id, *(getattr(TimetableEntry, c) for c in WRITE_COLUMNS))
+        .where(TimetableEntry.timetable_version_id == tv.id)
+    ).mappings():
+        key = tuple(row[c] for c in KEY_COLUMNS)
+        existing.setdefault(key, []).append((row["id"], row["weekday"], tuple(row[c] for c in VALUE_COLUMNS)))
+
+    catalog = FiltersCatalogBuilder()
+    revision = RevisionHasher()
+    updates: List[Dict[str, Any]] = []
+    changed_weekdays: set = set()
+    counts = {"total": 0, "unchanged": 0}
+
+    def new_rows() -> Iterator[Dict[str, Any]]:
+        for e in entries:
+            counts["total"] += 1
+            catalog.add(e)
+            add_to_revision(revision, e)
+
+            matches = existing.get(tuple(e[c] for c in KEY_COLUMNS))
+            if matches:
+                entry_id, _, old_values = matches.pop()
+                if old_values == tuple(e[c] for c in VALUE_COLUMNS):
+                    counts["unchanged"] += 1
+                else:
+                    updates.append({"id": entry_id, **{c: e[c] for c in VALUE_COLUMNS}})
+                    changed_weekdays.add(e["weekday"])
+                continue
+
+            changed_weekdays.add(e["weekday"])
+            yield e
+
+    inserted = copy_entries(db, tv.id, new_rows())
+
+    stale_ids = []
+    for matches in existing.values():
+        for entry_id, weekday, _ in matches:
+            stale_ids.append(entry_id)
+            changed_weekdays.add(weekday)
+    for i in range(0, len(stale_ids), _DELETE_CHUNK):
+        db.execute(delete(TimetableEntry).where(TimetableEntry.id.in_(stale_ids[i:i + _DELETE_CHUNK])))
+
+    if updates:
+        # UPDATE em lote por primary key (executemany)
+        db.execute(update(TimetableEntry), updates)
+
+    new_revision = revision.hexdigest()
+    if new_revision != tv.revision:
+        tv.filters_catalog = catalog.build()
+        tv.revision = new_revision
+
+    return {
+        "total": counts["total"],
+        "inserted": inserted,
+        "updated": len(updates),
+        "deleted": len(stale_ids),
+        "unchanged": counts["unchanged"],
+        "changed_weekdays": sorted(changed_weekdays),
+    }
@@ -0,0 +1,44 @@
+# app/services/token_revocations.py
+"""
+Revogação de tokens: a tabela revoked_tokens é a fonte de verdade; cada
+worker mantém o conjunto em memória (token_verifier.revocations) e recarrega
+periodicamente as linhas ainda não expiradas.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.tokens import RevocationSet
+from app.db.session import SessionLocal
+from app.models.revoked_token import RevokedToken
+
+
+def load_revocations(db: Session, revocations: RevocationSet) -> int:
+    now = datetime.now(timezone.utc)
+    rows = db.execute(
+        select(RevokedToken.token_id, RevokedToken.expires_at).where(RevokedToken.expires_at >= now)
+    ).all()
+    revocations.replace((tid, int(exp.timestamp())) for tid, exp in rows)
+    return len(rows)
+
+
+def refresh_revocations(revocations: RevocationSet) -> int:
+    """Recarrega numa sessão própria (chamado do get_current_user, fora de rota)."""
+    db = SessionLocal()
+    try:
+        return load_revocations(db, revocations)
+    finally:
+        db.close()
+
+
+def revoke_token(db: Session, revocations: RevocationSet, token_id: str, exp: int) -> None:
+    """Grava a revogação (e limpa as já expiradas). Faz commit."""
+    expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
+    db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.now(timezone.utc)))
+    if db.get(RevokedToken, token_id) is None:
+        db.add(RevokedToken(token_id=token_id, expires_at=expires_at))
+    db.commit()
+    revocations.add(token_id, exp)
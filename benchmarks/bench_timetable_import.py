@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compara os caminhos de escrita do import de horários (linhas/s):
+
+  - orm:        TimetableEntry(...) por linha + db.add_all (caminho antigo)
+  - executemany: INSERT em lote sem objetos ORM
+  - copy:       copy_entries do import (copy_rows: COPY FROM STDIN no psycopg2)
+
+Roda contra o Postgres de BENCH_DATABASE_URL (ou DATABASE_URL). Cada
+caminho roda numa transação que sofre rollback no fim: nada fica gravado.
+
+    python -m benchmarks.bench_timetable_import --rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.timetable import TimetableEntry
+from app.services.timetable_import import (
+    copy_entries,
+    get_or_create_version,
+    normalize_entry,
+)
+
+_DAYS = 5
+_SLOTS = ["07:30-08:20", "08:20-09:10", "09:30-10:20", "10:20-11:10", "13:20-14:10", "14:10-15:00"]
+
+
+def synthetic_payload(n: int) -> List[Dict[str, Any]]:
+    out = []
+    for i in range(n):
+        turma = i // (_DAYS * len(_SLOTS))
+        out.append({
+            "weekday": i % _DAYS,
+            "slot": _SLOTS[(i // _DAYS) % len(_SLOTS)],
+            "group_code": f"{turma % 3 + 1}º INFOR_M({turma % 3 + 1}.18.{turma}I) sala-{turma % 40:02d}",
+            "subject_name": f"Disciplina {i % 37}",
+            "teacher_name": f"Professor(a) {i % 91}",
+            "room": f"Sala {i % 40:02d}",
+        })
+    return out
+
+
+def _orm(db: Session, version_id: int, entries: List[Dict[str, Any]]) -> None:
+    db.add_all([TimetableEntry(timetable_version_id=version_id, **e) for e in entries])
+    db.flush()
+
+
+def _executemany(db: Session, version_id: int, entries: List[Dict[str, Any]]) -> None:
+    db.execute(
+        insert(TimetableEntry.__table__),
+        [{"timetable_version_id": version_id, **e} for e in entries],
+    )
+
+
+def _copy(db: Session, version_id: int, entries: List[Dict[str, Any]]) -> None:
+    # mesmo helper (e mesmas colunas, com as chaves de busca) do import
+    copy_entries(db, version_id, entries)
+
+
+PATHS: Dict[str, Callable[[Session, int, List[Dict[str, Any]]], None]] = {
+    "orm": _orm,
+    "executemany": _executemany,
+    "copy": _copy,
+}
+
+
+def run(database_url: str, rows: int, repeat: int) -> Dict[str, float]:
+    engine = create_engine(database_url)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    payload = synthetic_payload(rows)
+
+    results: Dict[str, float] = {}
+    for name, fn in PATHS.items():
+        best = float("inf")
+        for _ in range(repeat):
+            db = SessionLocal()
+            try:
+                tv, _ = get_or_create_version(db, "__bench__")
+                t0 = time.perf_counter()
+                # a normalização entra na conta: faz parte do custo de cada caminho
+                entries = [e for e in map(normalize_entry, payload) if e is not None]
+                fn(db, tv.id, entries)
+                best = min(best, time.perf_counter() - t0)
+            finally:
+                db.rollback()
+                db.close()
+        results[name] = rows / best
+    engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    database_url = os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("Defina BENCH_DATABASE_URL (ou DATABASE_URL) apontando para um Postgres de teste.")
+
+    results = run(database_url, args.rows, args.repeat)
+    baseline = results["orm"]
+    print(f"{'caminho':<12} {'linhas/s':>12} {'vs orm':>8}")
+    for name, rate in results.items():
+        print(f"{name:<12} {rate:>12,.0f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
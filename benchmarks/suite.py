@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks dos caminhos quentes da API:
+
+  - helpers: extract_class_code, slugify, parse_weekday, parse_slot
+  - tokens:  sign, verify (HMAC direto) e token_verifier.verify (com cache)
+  - POST /timetable/import (versão nova e reimport sem mudanças)
+  - POST /calendar/import (dias alterados e reimport sem mudanças)
+  - GET /timetable/{code} em todas as combinações de filtro (cache do
+    worker limpo a cada chamada) + uma com cache quente
+  - GET /timetable/{code}/filters
+
+As rotas passam pela app inteira (TestClient: roteamento, auth,
+serialização). Sem BENCH_DATABASE_URL roda num SQLite temporário
+(stand-in em processo; o upsert do calendário usa o ON CONFLICT do SQLite e
+a materialização de aulas fica desligada). Com BENCH_DATABASE_URL, use um
+banco de teste já migrado: o suite grava versões "__bench*" e dias de 2099
+e no fim apaga tudo, atualizando as revisões (ETags), o índice do
+calendário e as aulas como os imports fazem.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+    python -m benchmarks.suite --only get_timetable
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_timetable_import import synthetic_payload
+
+BENCH_CODE = "__bench__"
+BENCH_FIRST_DAY = date(2099, 1, 1)
+
+# filtros do GET /timetable/{code}; valores que existem no synthetic_payload
+_FILTERS = {
+    "group": "1.18.0I",
+    "course": "Informática",
+    "teacher": "professor(a) 1",
+    "room": "sala 0",
+    "weekday": 2,
+}
+
+
+# ----------------------------
+# medição
+# ----------------------------
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def measure_calls(fn: Callable[[int], Any], calls: int, warmup: int = 1, rows: int | None = None) -> Dict[str, Any]:
+    """Latência por chamada (ms); `rows` por chamada vira rows/s."""
+    for i in range(warmup):
+        fn(-1 - i)
+    latencies = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    total = sum(latencies)
+    result = {
+        "calls": calls,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 4),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 4),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4),
+    }
+    if rows:
+        result["rows_per_s"] = round(rows * calls / total, 1)
+    return result
+
+
+def measure_loop(fn: Callable[[Any], Any], inputs: List[Any], repeat: int) -> Dict[str, Any]:
+    """Funções de microssegundos: mede o lote inteiro (melhor de `repeat`)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for value in inputs:
+            fn(value)
+        best = min(best, time.perf_counter() - t0)
+    return {
+        "calls": len(inputs),
+        "mean_us": round(best / len(inputs) * 1e6, 4),
+        "ops_per_s": round(len(inputs) / best, 1),
+    }
+
+
+# ----------------------------
+# casos
+# ----------------------------
+
+def bench_helpers(n: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    from app.services.fet_csv import parse_slot, parse_weekday
+    from app.services.timetable_import import extract_class_code, slugify
+
+    payload = synthetic_payload(n)
+    groups = [row["group_code"] for row in payload]
+    names = [row["teacher_name"] for row in payload]
+    days = list(itertools.islice(itertools.cycle(
+        ["Segunda-feira", "Terça-feira", "Quarta feira", "Quinta-feira", "Sexta feira", "Sábado"]
+    ), n))
+    hours = list(itertools.islice(itertools.cycle(
+        ["07h30-8h20min", "8h20-9h10min", "9h30-10h20min", "14h10-15h00min", "invalido"]
+    ), n))
+    return {
+        "extract_class_code": measure_loop(extract_class_code, groups, repeat),
+        "slugify": measure_loop(slugify, names, repeat),
+        "parse_weekday": measure_loop(parse_weekday, days, repeat),
+        "parse_slot": measure_loop(parse_slot, hours, repeat),
+    }
+
+
+def bench_tokens(n: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    from app.core.security import sign, verify
+    from app.core.tokens import TokenVerifier
+
+    secret = "bench-secret"
+    claims = [{"sub": f"user{i}", "role": "professor"} for i in range(n)]
+    tokens = [sign(c, secret) for c in claims]
+    cached = TokenVerifier(secret, cache_size=n)
+    for token in tokens:
+        cached.verify(token)
+    return {
+        "sign": measure_loop(lambda c: sign(c, secret), claims, repeat),
+        "verify": measure_loop(lambda t: verify(t, secret), tokens, repeat),
+        "verify_cached": measure_loop(cached.verify, tokens, repeat),
+    }
+
+
+def bench_routes(client, headers, rows: int, calls: int) -> Dict[str, Dict[str, Any]]:
+    from app.api.routes.timetable import _timetable_cache
+
+    results: Dict[str, Dict[str, Any]] = {}
+    payload = synthetic_payload(rows)
+
+    def import_as(code: str) -> None:
+        r = client.post("/timetable/import", json=[{**row, "timetable_code": code} for row in payload], headers=headers)
+        r.raise_for_status()
+
+    # versão nova a cada chamada (diff contra vazio: tudo é insert)
+    results["import_timetable[new]"] = measure_calls(
+        lambda i: import_as(f"__bench{i + 1000:05d}__"), calls=max(1, calls // 4), rows=rows
+    )
+    import_as(BENCH_CODE)
+    results["import_timetable[unchanged]"] = measure_calls(
+        lambda i: import_as(BENCH_CODE), calls=max(1, calls // 4), rows=rows
+    )
+
+    days = [BENCH_FIRST_DAY + timedelta(days=d) for d in range(365)]
+
+    def import_calendar(i: int) -> None:
+        # alterna a observação: toda chamada muda os 365 dias
+        body = [
+            {"day": d.isoformat(), "is_school_day": d.weekday() < 5, "kind": "AULA_NORMAL", "note": f"bench {i % 2}"}
+            for d in days
+        ]
+        client.post("/calendar/import", json=body, headers=headers).raise_for_status()
+
+    results["import_calendar[changed]"] = measure_calls(import_calendar, calls=max(1, calls // 4), rows=len(days))
+    results["import_calendar[unchanged]"] = measure_calls(
+        lambda i: import_calendar(0), calls=max(1, calls // 4), rows=len(days)
+    )
+
+    # todas as combinações de filtro, renderizando de verdade (sem o cache do worker)
+    names = list(_FILTERS)
+    for size in range(len(names) + 1):
+        for combo in itertools.combinations(names, size):
+            params = {k: _FILTERS[k] for k in combo}
+
+            def get(i: int, params=params) -> None:
+                _timetable_cache.invalidate()
+                client.get(f"/timetable/{BENCH_CODE}", params=params, headers=headers).raise_for_status()
+
+            results[f"get_timetable[{'+'.join(combo) or 'all'}]"] = measure_calls(get, calls)
+
+    results["get_timetable[cached]"] = measure_calls(
+        lambda i: client.get(f"/timetable/{BENCH_CODE}", headers=headers).raise_for_status(), calls
+    )
+    results["get_filters"] = measure_calls(
+        lambda i: client.get(f"/timetable/{BENCH_CODE}/filters", headers=headers).raise_for_status(), calls
+    )
+    return results
+
+
+def _cleanup() -> None:
+    """Apaga o que o suite gravou com os mesmos efeitos colaterais dos imports."""
+    from sqlalchemy import delete, select
+
+    from app.api.routes.calendar import CALENDAR_SCOPE
+    from app.api.routes.timetable import VERSIONS_SCOPE, _timetable_cache, _versions_revision
+    from app.core.config import settings
+    from app.core.etag import chain_revision
+    from app.db.revisions import get_revision, set_revision
+    from app.db.session import SessionLocal
+    from app.models.calendar_day import CalendarDay
+    from app.models.class_session import ClassSession
+    from app.models.timetable import TimetableEntry, TimetableVersion
+    from app.services.calendar_index import calendar_index
+    from app.services.class_sessions import materialize_calendar_changes
+
+    db = SessionLocal()
+    try:
+        bench = db.execute(
+            select(TimetableVersion.id).where(TimetableVersion.code.like("\\_\\_bench%", escape="\\"))
+        ).scalars().all()
+        if bench:
+            db.execute(delete(ClassSession).where(ClassSession.timetable_version_id.in_(bench)))
+            db.execute(delete(TimetableEntry).where(TimetableEntry.timetable_version_id.in_(bench)))
+            db.execute(delete(TimetableVersion).where(TimetableVersion.id.in_(bench)))
+            set_revision(db, VERSIONS_SCOPE, _versions_revision(db))
+
+        days = db.execute(
+            delete(CalendarDay).where(CalendarDay.day >= BENCH_FIRST_DAY).returning(CalendarDay.day)
+        ).scalars().all()
+        if days:
+            # mesma regra do import_calendar: revisão encadeada + aulas dos dias afetados
+            previous = get_revision(db, CALENDAR_SCOPE)
+            set_revision(db, CALENDAR_SCOPE, chain_revision(previous, "deleted", min(days), max(days), len(days)))
+            if settings.SESSIONS_AUTO_MATERIALIZE:
+                materialize_calendar_changes(db, days)
+        db.commit()
+
+        # só depois do commit, e só se tudo acima deu certo
+        _timetable_cache.invalidate()
+        if days:
+            calendar_index.invalidate()
+    finally:
+        db.close()
+
+
+# ----------------------------
+# baseline
+# ----------------------------
+
+_COMPARED = (("mean_ms", False), ("mean_us", False), ("rows_per_s", True), ("ops_per_s", True))
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    base = baseline.get("results", {})
+    print(f"\nvs baseline ({baseline.get('environment', {}).get('backend')}, {baseline.get('created_at')}):")
+    for name, current in results.items():
+        previous = base.get(name)
+        if not previous:
+            continue
+        for key, higher_is_better in _COMPARED:
+            if key in current and previous.get(key):
+                change = current[key] / previous[key] - 1
+                better = change > 0 if higher_is_better else change < 0
+                print(f"  {name:<48} {key:<11} {previous[key]:>12,.2f} -> {current[key]:>12,.2f}"
+                      f"  {change:+7.1%} {'melhor' if better else 'pior'}")
+                break
+
+
+def _print(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'caso':<48} {'média':>12} {'p50':>10} {'p95':>10} {'p99':>10} {'vazão':>16}")
+    for name, r in results.items():
+        if "mean_us" in r:
+            print(f"{name:<48} {r['mean_us']:>10.3f}us {'':>10} {'':>10} {'':>10} {r['ops_per_s']:>12,.0f} op/s")
+        else:
+            rate = f"{r['rows_per_s']:>11,.0f} rows/s" if "rows_per_s" in r else ""
+            print(f"{name:<48} {r['mean_ms']:>10.3f}ms {r['p50_ms']:>8.3f}ms {r['p95_ms']:>8.3f}ms"
+                  f" {r['p99_ms']:>8.3f}ms {rate:>16}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="linhas do horário sintético")
+    parser.add_argument("--calls", type=int, default=20, help="chamadas por caso de rota")
+    parser.add_argument("--micro", type=int, default=20000, help="entradas por helper/token")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="mostra (e grava) só os casos que começam com este prefixo")
+    parser.add_argument("--save", metavar="JSON", help="grava os resultados como baseline")
+    parser.add_argument("--compare", metavar="JSON", help="compara com um baseline gravado")
+    args = parser.parse_args()
+
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    postgres = bool(database_url) and database_url.startswith("postgresql")
+    tmpdir = None
+    if not database_url:
+        tmpdir = tempfile.TemporaryDirectory(prefix="inovaulas-bench-")
+        database_url = f"sqlite:///{tmpdir.name}/bench.sqlite"
+
+    # o Settings é lido no import do app: ambiente antes de qualquer import de app.*
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("AUTH_SECRET", "bench-secret")
+    os.environ["LOGIN_USERNAME"] = ""
+    os.environ["DB_ASYNC"] = "false"
+    if not postgres:
+        # a materialização de aulas usa SQL de Postgres (extract isodow)
+        os.environ["SESSIONS_AUTO_MATERIALIZE"] = "false"
+
+    from fastapi.testclient import TestClient
+
+    from app.core.tokens import token_verifier
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import app
+
+    if tmpdir is not None:
+        Base.metadata.create_all(engine)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        results.update(bench_helpers(args.micro, args.repeat))
+        results.update(bench_tokens(args.micro, args.repeat))
+        with TestClient(app) as client:
+            headers = {"Authorization": "Bearer " + token_verifier.sign({"sub": "bench", "role": "admin"}, 3600)}
+            results.update(bench_routes(client, headers, args.rows, args.calls))
+    finally:
+        if tmpdir is None:
+            _cleanup()
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    if args.only:
+        results = {k: v for k, v in results.items() if k.startswith(args.only)}
+    _print(results)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(results, json.load(fh))
+
+    if args.save:
+        document = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": {
+                "backend": "postgresql" if postgres else "sqlite (stand-in)",
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "rows": args.rows,
+                "calls": args.calls,
+                "micro": args.micro,
+            },
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(document, fh, indent=2, ensure_ascii=False)
+            fh.write("\n")
+        print(f"\nbaseline gravado em {args.save}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
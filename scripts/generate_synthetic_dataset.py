@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gera um conjunto sintético (horários FET + calendário) no tamanho de uma
+rede de campi, para teste de carga do import_timetable / get_filters /
+get_timetable e do import_calendar.
+
+Saída (mesmo layout das chaves no R2, dá pra subir a pasta inteira):
+
+  <out>/horarios/<campus>/index.json        {"current_key": ".../<campus>.csv"}
+  <out>/horarios/<campus>/<campus>.csv      Day,Hour,Students Sets,Subject,Teachers,Room
+  <out>/calendario/index.json               {"current_key": "calendario/calendario.xlsx"}
+  <out>/calendario/calendario.xlsx          aba "export" (ou uma "export_<ano>" por ano)
+  <out>/calendario/calendario.csv           data,letivo,tipo,observacao
+
+Os CSVs do FET passam pelo app/services/fet_csv.iter_fet_rows e a planilha
+pelo read_export_sheet do sync_calendar_from_r2.
+
+    python scripts/generate_synthetic_dataset.py --campuses 30 --courses 8 --classes 12 --years 2026 2027
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+import openpyxl
+
+
+# ----------------------------
+# Catálogos
+# ----------------------------
+
+WEEKDAYS = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira", "Sábado"]
+
+# (sigla, código no class_code, letra da turma); 18 e 28 são os que a API conhece
+COURSES = [
+    ("INFOR", "18", "I"),
+    ("MA", "28", "A"),
+    ("EDIF", "38", "E"),
+    ("AGRO", "48", "G"),
+    ("ELETRO", "58", "L"),
+    ("QUIM", "68", "Q"),
+    ("ADM", "78", "D"),
+    ("MEC", "88", "M"),
+]
+
+SHIFTS = ["M", "V", "N"]
+
+SUBJECTS = [
+    "Matemática", "Língua Portuguesa", "Física", "Química", "Biologia", "História",
+    "Geografia", "Sociologia", "Filosofia", "Educação Física", "Artes", "Inglês",
+    "Espanhol", "Programação", "Banco de Dados", "Redes de Computadores",
+    "Gestão Ambiental", "Topografia", "Eletrônica Digital", "Desenho Técnico",
+]
+
+FIRST_NAMES = [
+    "Conceição", "João", "Márcia", "Antônio", "Lúcia", "José", "Ana", "Sérgio",
+    "Patrícia", "Cláudio", "Fátima", "Luís", "Mônica", "Raimundo", "Inês", "André",
+]
+SURNAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Araújo", "Conceição", "Pereira",
+    "Gonçalves", "Brandão", "Magalhães", "Assunção", "Ribeiro", "Nóbrega",
+]
+
+# feriados nacionais de data fixa (MM-DD)
+FIXED_HOLIDAYS = {
+    "01-01": "Confraternização Universal",
+    "04-21": "Tiradentes",
+    "05-01": "Dia do(a) Trabalhador(a)",
+    "09-07": "Independência do Brasil",
+    "10-12": "Padroeira do Brasil",
+    "11-02": "Finados",
+    "11-15": "Proclamação da República",
+    "11-20": "Consciência Negra",
+    "12-25": "Natal",
+}
+
+# semestres (MM-DD) no mesmo desenho do build_calendar_2026
+SEMESTERS = [
+    ("02-19", "05-29", "SEMESTRE_I"),
+    ("06-01", "09-11", "SEMESTRE_II"),
+    ("09-14", "12-16", "SEMESTRE_III"),
+]
+
+
+# ----------------------------
+# Horários (FET)
+# ----------------------------
+
+def fet_slots(count: int, start_minutes: int = 7 * 60 + 30, length: int = 50) -> List[str]:
+    """'07h30-8h20min', '8h20-9h10min', ... (formato que o parse_slot aceita)."""
+    out = []
+    t = start_minutes
+    for i in range(count):
+        # intervalo de 20 min depois da 2ª aula de cada bloco de 5
+        if i and i % 5 == 2:
+            t += 20
+        a, b = t, t + length
+        first = f"{a // 60:02d}h{a % 60:02d}" if i == 0 else f"{a // 60}h{a % 60:02d}"
+        out.append(f"{first}-{b // 60}h{b % 60:02d}min")
+        t = b
+    return out
+
+
+def campus_groups(courses: int, classes: int) -> List[str]:
+    """Students Sets de um campus, ex. '1º INFOR_M(1.18.1I) sala-01'."""
+    out = []
+    for abbr, code, letter in COURSES[:courses]:
+        for i in range(classes):
+            serie = i % 3 + 1
+            shift = SHIFTS[(i // 3) % len(SHIFTS)]
+            out.append(f"{serie}º {abbr}_{shift}({serie}.{code}.{i + 1}{letter}) sala-{len(out) + 1:02d}")
+    return out
+
+
+def teacher_names(campus: int, count: int, rng: random.Random) -> List[str]:
+    names = []
+    for i in range(count):
+        names.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)} {campus:02d}{i:03d}")
+    return names
+
+
+def iter_campus_rows(
+    campus: int,
+    courses: int,
+    classes: int,
+    teachers: int,
+    rooms: int,
+    slots: List[str],
+    days: List[str],
+    rng: random.Random,
+) -> Iterator[Dict[str, str]]:
+    """
+    Uma linha por turma × dia × horário. Professor da turma c no horário s é
+    (c + s) % teachers, então sem choque de professor enquanto
+    teachers >= turmas; sala fixa por turma (choque só se rooms < turmas).
+    """
+    groups = campus_groups(courses, classes)
+    names = teacher_names(campus, teachers, rng)
+    room_names = [f"Sala {r + 1:02d}" for r in range(rooms)]
+
+    for d, day in enumerate(days):
+        for s, hour in enumerate(slots):
+            step = d * len(slots) + s
+            for c, students_set in enumerate(groups):
+                yield {
+                    "Day": day,
+                    "Hour": hour,
+                    "Students Sets": students_set,
+                    "Subject": SUBJECTS[(c + step) % len(SUBJECTS)],
+                    "Teachers": names[(c + step) % teachers],
+                    "Room": room_names[c % rooms],
+                }
+
+
+def write_timetables(out_dir: str, args: argparse.Namespace, rng: random.Random) -> int:
+    slots = fet_slots(args.slots)
+    days = WEEKDAYS[:args.days]
+    total = 0
+    for campus in range(1, args.campuses + 1):
+        name = f"campus{campus:02d}"
+        folder = os.path.join(out_dir, "horarios", name)
+        os.makedirs(folder, exist_ok=True)
+        key = f"horarios/{name}/{name}.csv"
+        with open(os.path.join(out_dir, key), "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=["Day", "Hour", "Students Sets", "Subject", "Teachers", "Room"])
+            w.writeheader()
+            for row in iter_campus_rows(campus, args.courses, args.classes, args.teachers, args.rooms, slots, days, rng):
+                w.writerow(row)
+                total += 1
+        with open(os.path.join(folder, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({"current_key": key}, f)
+    return total
+
+
+# ----------------------------
+# Calendário
+# ----------------------------
+
+def easter(year: int) -> date:
+    # algoritmo de Meeus/Jones/Butcher
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def holidays(year: int) -> Dict[date, Tuple[str, str]]:
+    out = {date.fromisoformat(f"{year}-{md}"): ("FERIADO", name) for md, name in FIXED_HOLIDAYS.items()}
+    e = easter(year)
+    out[e - timedelta(days=48)] = ("PONTO_FACULTATIVO", "Carnaval")
+    out[e - timedelta(days=47)] = ("PONTO_FACULTATIVO", "Carnaval")
+    out[e - timedelta(days=2)] = ("FERIADO", "Paixão de Cristo")
+    out[e + timedelta(days=60)] = ("FERIADO", "Corpus Christi")
+    return out
+
+
+def iter_calendar_year(year: int) -> Iterator[Tuple[date, bool, str, str]]:
+    """(dia, letivo, tipo, observacao) para todos os dias do ano."""
+    semesters = [
+        (date.fromisoformat(f"{year}-{a}"), date.fromisoformat(f"{year}-{b}"), name)
+        for a, b, name in SEMESTERS
+    ]
+    special = holidays(year)
+    day = date(year, 1, 1)
+    while day.year == year:
+        term = next((name for a, b, name in semesters if a <= day <= b), None)
+        if day in special:
+            kind, extra = special[day]
+            letivo, note = False, f"{extra} | {term}" if term else extra
+        elif term is None:
+            letivo, kind, note = False, "RECESSO", ""
+        elif day.weekday() > 4:
+            letivo, kind, note = False, "NAO_LETIVO", term
+        else:
+            letivo, kind, note = True, "AULA_NORMAL", term
+        yield day, letivo, kind, note
+        day += timedelta(days=1)
+
+
+CALENDAR_HEADER = ["data", "letivo", "tipo", "observacao"]
+
+
+def write_calendar(out_dir: str, years: List[int], per_year_sheets: bool) -> int:
+    folder = os.path.join(out_dir, "calendario")
+    os.makedirs(folder, exist_ok=True)
+
+    # write_only: a planilha vai pro disco linha a linha
+    wb = openpyxl.Workbook(write_only=True)
+    sheets = {}
+    if not per_year_sheets:
+        ws = wb.create_sheet("export")
+        ws.append(CALENDAR_HEADER)
+
+    total = 0
+    with open(os.path.join(folder, "calendario.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CALENDAR_HEADER)
+        for year in years:
+            if per_year_sheets:
+                ws = sheets[year] = wb.create_sheet(f"export_{year}")
+                ws.append(CALENDAR_HEADER)
+            for day, letivo, kind, note in iter_calendar_year(year):
+                flag = "sim" if letivo else "nao"
+                ws.append([day, flag, kind, note])
+                # mesmo formato do "Calendário Acadêmico" (import_calendar_csv.py)
+                w.writerow([day.strftime("%d/%m/%Y"), flag, kind, note])
+                total += 1
+
+    wb.save(os.path.join(folder, "calendario.xlsx"))
+    with open(os.path.join(folder, "index.json"), "w", encoding="utf-8") as f:
+        json.dump({"current_key": "calendario/calendario.xlsx"}, f)
+    return total
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="tmp/synthetic")
+    parser.add_argument("--campuses", type=int, default=3)
+    parser.add_argument("--courses", type=int, default=4, help=f"cursos por campus (máx {len(COURSES)})")
+    parser.add_argument("--classes", type=int, default=6, help="turmas por curso")
+    parser.add_argument("--teachers", type=int, default=None, help="professores por campus (padrão: nº de turmas)")
+    parser.add_argument("--rooms", type=int, default=None, help="salas por campus (padrão: nº de turmas)")
+    parser.add_argument("--slots", type=int, default=6, help="aulas por dia")
+    parser.add_argument("--days", type=int, default=5, help="dias por semana (5 = seg-sex, 6 = com sábado)")
+    parser.add_argument("--years", type=int, nargs="+", default=[2026])
+    parser.add_argument("--sheet-per-year", action="store_true", help='abas "export_<ano>" em vez de uma "export"')
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    args.courses = max(1, min(args.courses, len(COURSES)))
+    args.days = max(1, min(args.days, len(WEEKDAYS)))
+    groups = args.courses * args.classes
+    args.teachers = args.teachers or groups
+    args.rooms = args.rooms or groups
+
+    rng = random.Random(args.seed)
+    rows = write_timetables(args.out, args, rng)
+    days = write_calendar(args.out, sorted(set(args.years)), args.sheet_per_year)
+
+    print(f"OK horários: {args.campuses} campi × {groups} turmas → {rows} linhas FET em {args.out}/horarios")
+    print(f"OK calendário: {days} dias ({', '.join(map(str, sorted(set(args.years))))}) em {args.out}/calendario")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Acesso ao R2 compartilhado pelos scripts.
+
+- um client só por processo (pool de conexões e credenciais reaproveitados
+  entre downloads e entre threads: o client do boto3 é thread-safe)
+- download_file: multipart/ranged em paralelo (TransferConfig) para objetos
+  grandes
+- download_ranges: o resto de um objeto em ranges paralelos, todos com
+  If-Match no ETag da primeira resposta (usado pelo r2_cache)
+- download_bytes/download_text: objetos pequenos direto para a memória, sem
+  passar por tmp/
+
+Ajuste por env: R2_MAX_CONNECTIONS, R2_DOWNLOAD_CONCURRENCY,
+R2_MULTIPART_THRESHOLD_MB, R2_MULTIPART_CHUNK_MB.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+_MB = 1024 * 1024
+
+# a Session default do boto3 não é thread-safe: o client é criado uma vez, sob lock
+_client_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    v = os.getenv(name)
+    return int(v) if v else default
+
+
+def _env_required(name: str) -> str:
+    v = os.getenv(name)
+    if not v:
+        raise SystemExit(f"[ERRO] Variável de ambiente obrigatória não definida: {name}")
+    return v
+
+
+def client():
+    with _client_lock:
+        return _client()
+
+
+@lru_cache(maxsize=None)
+def _client():
+    concurrency = _env_int("R2_DOWNLOAD_CONCURRENCY", 8)
+    return boto3.client(
+        "s3",
+        endpoint_url=_env_required("R2_ENDPOINT"),
+        aws_access_key_id=_env_required("R2_ACCESS_KEY_ID"),
+        aws_secret_access_key=_env_required("R2_SECRET_ACCESS_KEY"),
+        region_name="auto",
+        config=Config(
+            # folga para vários downloads em ranges paralelos ao mesmo tempo
+            max_pool_connections=_env_int("R2_MAX_CONNECTIONS", max(10, concurrency * 4)),
+            retries={"max_attempts": 5, "mode": "adaptive"},
+            tcp_keepalive=True,
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def transfer_config() -> TransferConfig:
+    chunk = _env_int("R2_MULTIPART_CHUNK_MB", 8) * _MB
+    return TransferConfig(
+        multipart_threshold=_env_int("R2_MULTIPART_THRESHOLD_MB", 8) * _MB,
+        multipart_chunksize=chunk,
+        max_concurrency=_env_int("R2_DOWNLOAD_CONCURRENCY", 8),
+        io_chunksize=256 * 1024,
+        use_threads=True,
+    )
+
+
+def content_size(response: Dict[str, Any]) -> Optional[int]:
+    """Tamanho do objeto inteiro numa resposta do get_object (206 traz em ContentRange)."""
+    content_range = response.get("ContentRange")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total != "*":
+            return int(total)
+    return response.get("ContentLength")
+
+
+def download_ranges(bucket: str, key: str, path: str, start: int, end: int, etag: str, s3=None) -> None:
+    """
+    Grava [start, end) do objeto em `path` (já existente) em ranges paralelos.
+    Todas as partes levam If-Match: objeto trocado no meio dá 412 em vez de
+    misturar versões no arquivo.
+    """
+    s3 = s3 or client()
+    config = transfer_config()
+    ranges = [(a, min(a + config.multipart_chunksize, end)) for a in range(start, end, config.multipart_chunksize)]
+
+    def fetch(part) -> None:
+        a, b = part
+        body = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={a}-{b - 1}", IfMatch=etag)["Body"]
+        with open(path, "r+b") as out:
+            out.seek(a)
+            for chunk in iter(lambda: body.read(config.io_chunksize), b""):
+                out.write(chunk)
+            if out.tell() != b:
+                raise IOError(f"range incompleto em {key}: {a}-{b - 1}")
+
+    with ThreadPoolExecutor(max_workers=config.max_concurrency, thread_name_prefix="r2-range") as pool:
+        list(pool.map(fetch, ranges))
+
+
+def download_file(bucket: str, key: str, out_path: str) -> None:
+    """Download para arquivo; acima do threshold, em ranges paralelos."""
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    client().download_file(bucket, key, out_path, Config=transfer_config())
+
+
+def download_bytes(bucket: str, key: str) -> bytes:
+    """Objeto inteiro em memória (index.json, CSVs pequenos)."""
+    return client().get_object(Bucket=bucket, Key=key)["Body"].read()
+
+
+def download_text(bucket: str, key: str, encoding: str = "utf-8") -> str:
+    return download_bytes(bucket, key).decode(encoding)
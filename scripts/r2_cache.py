@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Cache local dos objetos do R2 para os scripts de sync.
+
+- objetos guardados por conteúdo: <SYNC_CACHE_DIR>/objects/<sha256><ext>
+- GET condicional (If-None-Match com o ETag guardado): objeto igual = 304,
+  nada é baixado. O GET já pede só o primeiro range (R2_MULTIPART_THRESHOLD_MB):
+  objeto pequeno vem inteiro nele; num grande o resto vem em ranges paralelos
+  com If-Match no ETag dessa resposta, que é o ETag gravado
+- state.json lembra, por fonte (ex.: "timetable:tecnico_2026"), qual
+  conteúdo já foi importado com sucesso: sem mudança, o sync sai cedo sem
+  login nem POST na API
+- cada gravação relê e mescla o state.json sob flock (state.json.lock):
+  syncs de cron que se sobrepõem não apagam as entradas um do outro
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+import r2
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock entre threads
+    fcntl = None
+
+_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CachedObject:
+    key: str
+    path: Path
+    sha256: str
+    etag: Optional[str]
+    # False = veio do cache (304); True = baixado agora
+    downloaded: bool
+
+    def read_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+
+def _not_modified(e: ClientError) -> bool:
+    meta = e.response.get("ResponseMetadata", {})
+    return meta.get("HTTPStatusCode") == 304 or e.response.get("Error", {}).get("Code") in ("304", "NotModified")
+
+
+def _invalid_range(e: ClientError) -> bool:
+    # objeto vazio não tem byte 0: o Range dá 416
+    meta = e.response.get("ResponseMetadata", {})
+    return meta.get("HTTPStatusCode") == 416 or e.response.get("Error", {}).get("Code") == "InvalidRange"
+
+
+class R2Cache:
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = Path(root or os.getenv("SYNC_CACHE_DIR", "tmp/r2_cache"))
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.root / "state.json"
+        self.lock_path = self.root / "state.json.lock"
+        # threads do mesmo processo dividem o cache; outros processos, o state.json
+        self._lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = {"objects": {}, "imports": {}}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.state_path.exists():
+            return
+        try:
+            loaded = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return  # state corrompido: fica o que está em memória (só custa um download)
+        self.state = {
+            "objects": dict(loaded.get("objects", {})),
+            "imports": dict(loaded.get("imports", {})),
+        }
+
+    @contextmanager
+    def _locked(self):
+        """
+        Lock entre threads + flock entre processos, com o state relido do
+        disco: a alteração feita dentro do bloco é mesclada no que os outros
+        processos já gravaram.
+        """
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._load()
+            yield self.state
+
+    # ----------------------------
+    # objetos
+    # ----------------------------
+
+    def _blob_path(self, sha256: str, key: str) -> Path:
+        # a extensão fica (o openpyxl recusa arquivo sem .xlsx)
+        return self.objects_dir / f"{sha256}{Path(key).suffix.lower()}"
+
+    def cached(self, key: str) -> Optional[CachedObject]:
+        entry = self.state["objects"].get(key)
+        if not entry:
+            return None
+        path = self._blob_path(entry["sha256"], key)
+        if not path.exists():
+            return None
+        return CachedObject(key, path, entry["sha256"], entry.get("etag"), downloaded=False)
+
+    def fetch(self, bucket: str, key: str, s3=None) -> CachedObject:
+        """GET condicional: devolve o blob do cache se o ETag não mudou."""
+        s3 = s3 or r2.client()
+        previous = self.cached(key)
+        params: Dict[str, Any] = {"Bucket": bucket, "Key": key}
+        if previous and previous.etag:
+            params["IfNoneMatch"] = previous.etag
+
+        try:
+            try:
+                obj = s3.get_object(Range=f"bytes=0-{r2.transfer_config().multipart_threshold - 1}", **params)
+            except ClientError as e:
+                if not _invalid_range(e):
+                    raise
+                obj = s3.get_object(**params)
+        except ClientError as e:
+            if previous and _not_modified(e):
+                return previous
+            raise
+
+        etag = obj.get("ETag")
+        size = r2.content_size(obj)
+        h = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.objects_dir, suffix=".part")
+        try:
+            received = 0
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: obj["Body"].read(_CHUNK), b""):
+                    h.update(chunk)
+                    out.write(chunk)
+                    received += len(chunk)
+            if size is not None and received < size:
+                # grande: o resto em ranges paralelos, presos ao mesmo ETag
+                r2.download_ranges(bucket, key, tmp, received, size, etag, s3=s3)
+                with open(tmp, "rb") as f:
+                    f.seek(received)
+                    for chunk in iter(lambda: f.read(_CHUNK), b""):
+                        h.update(chunk)
+            sha256 = h.hexdigest()
+            path = self._blob_path(sha256, key)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self._locked() as state:
+            state["objects"][key] = {"etag": etag, "sha256": sha256}
+            self._save()
+        if previous and previous.sha256 != sha256:
+            self._drop_if_unused(previous)
+        return CachedObject(key, path, sha256, etag, downloaded=True)
+
+    def _drop_if_unused(self, obj: CachedObject) -> None:
+        # state mesclado: um blob ainda referenciado por outro processo fica
+        with self._locked() as state:
+            referenced = {e["sha256"] for e in state["objects"].values()}
+            referenced |= {e.get("sha256") for e in state["imports"].values()}
+            if obj.sha256 not in referenced and obj.path.exists():
+                obj.path.unlink()
+
+    # ----------------------------
+    # imports
+    # ----------------------------
+
+    def is_imported(self, source: str, obj: CachedObject) -> bool:
+        done = self.state["imports"].get(source)
+        return bool(done) and done.get("key") == obj.key and done.get("sha256") == obj.sha256
+
+    def mark_imported(self, source: str, obj: CachedObject) -> None:
+        with self._locked() as state:
+            old = state["imports"].get(source)
+            state["imports"][source] = {"key": obj.key, "sha256": obj.sha256, "etag": obj.etag}
+            self._save()
+        if old and old.get("sha256") != obj.sha256:
+            path = self._blob_path(old["sha256"], old["key"])
+            self._drop_if_unused(CachedObject(old["key"], path, old["sha256"], old.get("etag"), downloaded=False))
+
+    def _save(self) -> None:
+        # chamado dentro do _locked(); escrita atômica: cron interrompido não deixa state.json pela metade
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+
+def force_sync() -> bool:
+    """SYNC_FORCE=1 reimporta mesmo sem mudança na origem."""
+    return os.getenv("SYNC_FORCE", "").strip().lower() in {"1", "true", "yes", "sim"}
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sync noturno de todas as fontes do R2 de uma vez.
+
+    python scripts/sync_all.py                       # SYNC_SOURCES ou o padrão
+    python scripts/sync_all.py timetable:tecnico timetable:superior calendar
+    python scripts/sync_all.py timetable:tecnico=tecnico_2026_v2 calendar:calendarios/superior/index.json
+
+Fontes:
+    timetable:<tipo>[=<timetable_code>]   horarios/<tipo>/index.json (code padrão <tipo>_2026)
+    calendar[:<index_key>]                index do calendário (padrão R2_INDEX_KEY), aba SHEET_NAME
+
+Cada fonte roda download -> parse -> POST numa thread própria (SYNC_WORKERS,
+padrão = nº de fontes): o tempo total fica perto do da fonte mais lenta, não
+da soma. Threads bastam: download e POST são I/O, e o único parse pesado (o
+XLSX do calendário) é de uma fonte só. O login é feito uma vez, só quando a
+primeira fonte com mudança chega no POST (tudo igual = nenhuma chamada à API),
+e o mesmo token vai para todas. Cache/ETag e SYNC_FORCE como nos scripts
+individuais.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import sync_calendar_from_r2 as calendar_sync
+import sync_timetable_from_r2 as timetable_sync
+from r2_cache import R2Cache, force_sync
+
+try:
+    from dotenv import load_dotenv
+except Exception:
+    load_dotenv = None
+
+DEFAULT_SOURCES = "timetable:tecnico,timetable:superior,calendar"
+STAGES = ("download", "parse", "post")
+
+
+# ----------------------------
+# Resultado por fonte
+# ----------------------------
+
+@dataclass
+class SourceResult:
+    source: str
+    status: str = "pendente"  # importado | sem mudanças | erro
+    detail: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+
+class TokenProvider:
+    """Um login só para todas as fontes, feito na primeira vez que alguém precisa."""
+
+    def __init__(self, api_base_url: str, username: str) -> None:
+        self.api_base_url = api_base_url
+        self.username = username
+        self._token: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        with self._lock:
+            if self._token is None:
+                self._token = timetable_sync.api_login_and_get_token(self.api_base_url, self.username)
+                print("OK login automático. Token recebido.")
+            return self._token
+
+
+# ----------------------------
+# Fontes
+# ----------------------------
+
+def sync_timetable(
+    cache: R2Cache, bucket: str, api_base_url: str, tokens: TokenProvider,
+    timetable_type: str, timetable_code: str, import_mode: str, result: SourceResult,
+) -> None:
+    with result.stage("download"):
+        index = timetable_sync.load_index_json(cache, bucket, f"horarios/{timetable_type}/index.json")
+        csv_key = index.get("current_key")
+        if not csv_key:
+            timetable_sync.die("index.json sem current_key")
+        csv_obj = cache.fetch(bucket, csv_key)
+
+    source = f"timetable:{timetable_code}"
+    if cache.is_imported(source, csv_obj) and not force_sync():
+        result.status, result.detail = "sem mudanças", csv_key
+        return
+
+    # parse: json = CSV -> List[Dict] aqui; csv = só o gzip (o parse é da API)
+    with result.stage("parse"):
+        if import_mode == "json":
+            payload = timetable_sync.read_timetable_csv_and_transform(str(csv_obj.path), timetable_code)
+            if not payload:
+                timetable_sync.die("Nenhuma linha válida após conversão (weekday/slot/group_code). Verifique CSV.")
+        else:
+            payload = timetable_sync.gzip_csv(str(csv_obj.path))
+
+    with result.stage("post"):
+        token = tokens.get()
+        if import_mode == "json":
+            status, body = timetable_sync.post_timetable_import(api_base_url, token, payload)
+        else:
+            with payload:
+                status, body = timetable_sync.post_timetable_csv_gz(api_base_url, token, payload, timetable_code)
+
+    if status != 200:
+        detail = json.dumps(body, ensure_ascii=False) if isinstance(body, (dict, list)) else str(body)
+        timetable_sync.die(f"Erro na importação de horários ({status}): {detail}", 2)
+
+    cache.mark_imported(source, csv_obj)
+    result.status, result.detail = "importado", csv_key
+
+
+def sync_calendar(
+    cache: R2Cache, bucket: str, api_base_url: str, tokens: TokenProvider,
+    index_key: str, sheet_name: str, result: SourceResult,
+) -> None:
+    with result.stage("download"):
+        index = json.loads(cache.fetch(bucket, index_key).read_bytes().decode("utf-8"))
+        current_key = index.get("current_key")
+        if not current_key:
+            calendar_sync.die("index.json não possui current_key")
+        xlsx = cache.fetch(bucket, current_key)
+
+    source = f"calendar:{index_key}:{sheet_name}"
+    if cache.is_imported(source, xlsx) and not force_sync():
+        result.status, result.detail = "sem mudanças", current_key
+        return
+
+    # as linhas ficam em memória (poucos milhares de dias) para o parse ter
+    # tempo próprio e rodar em paralelo com os downloads das outras fontes
+    with result.stage("parse"):
+        rows = list(calendar_sync.iter_export_rows(str(xlsx.path), sheet_name))
+        if not rows:
+            calendar_sync.die("Nenhuma linha válida na planilha (data | letivo)")
+
+    with result.stage("post"):
+        calendar_sync.post_calendar_import(api_base_url, tokens.get(), rows)
+
+    cache.mark_imported(source, xlsx)
+    result.status, result.detail = "importado", current_key
+
+
+def build_jobs(
+    specs: List[str], cache: R2Cache, bucket: str, api_base_url: str, tokens: TokenProvider,
+) -> List[tuple[SourceResult, Callable[[], None]]]:
+    import_mode = os.getenv("IMPORT_MODE", "csv").strip().lower()
+    jobs: List[tuple[SourceResult, Callable[[], None]]] = []
+
+    for spec in specs:
+        kind, _, arg = spec.partition(":")
+        result = SourceResult(spec)
+
+        if kind == "timetable":
+            timetable_type, _, timetable_code = arg.partition("=")
+            timetable_type = timetable_type.strip().lower()
+            if not timetable_type:
+                raise SystemExit(f"[ERRO] Fonte inválida: {spec} (use timetable:<tipo>)")
+            timetable_code = timetable_code.strip() or f"{timetable_type}_2026"
+            run = partial(sync_timetable, cache, bucket, api_base_url, tokens,
+                          timetable_type, timetable_code, import_mode, result)
+        elif kind == "calendar":
+            index_key = arg.strip() or os.getenv("R2_INDEX_KEY")
+            if not index_key:
+                raise SystemExit(f"[ERRO] Fonte {spec} sem index: use calendar:<index_key> ou R2_INDEX_KEY")
+            sheet_name = os.getenv("SHEET_NAME", "export")
+            run = partial(sync_calendar, cache, bucket, api_base_url, tokens, index_key, sheet_name, result)
+        else:
+            raise SystemExit(f"[ERRO] Fonte desconhecida: {spec}")
+
+        jobs.append((result, run))
+    return jobs
+
+
+def run_job(result: SourceResult, run: Callable[[], None]) -> SourceResult:
+    try:
+        run()
+    except SystemExit as e:
+        # die() dos scripts: a mensagem já foi impressa, falha só esta fonte
+        result.status, result.detail = "erro", f"exit {e.code}"
+    except Exception as e:
+        result.status, result.detail = "erro", f"{type(e).__name__}: {e}"
+    return result
+
+
+# ----------------------------
+# Relatório
+# ----------------------------
+
+def print_report(results: List[SourceResult], wall: float) -> None:
+    width = max(len(r.source) for r in results)
+    print()
+    print(f"{'fonte':<{width}}  {'status':<13}" + "".join(f"{s:>10}" for s in STAGES) + f"{'total':>10}")
+    for r in results:
+        cells = "".join(f"{r.timings[s]:>9.2f}s" if s in r.timings else f"{'-':>10}" for s in STAGES)
+        print(f"{r.source:<{width}}  {r.status:<13}{cells}{r.total:>9.2f}s  {r.detail}")
+    serial = sum(r.total for r in results)
+    print(f"\nTempo total: {wall:.2f}s (soma das fontes: {serial:.2f}s)")
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> None:
+    if load_dotenv:
+        load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Sync paralelo de horários e calendários do R2 para a API.")
+    parser.add_argument("sources", nargs="*", help=f"fontes (padrão: SYNC_SOURCES ou {DEFAULT_SOURCES})")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SYNC_WORKERS", "0")),
+                        help="threads (padrão: uma por fonte)")
+    args = parser.parse_args()
+
+    specs = args.sources or [s.strip() for s in os.getenv("SYNC_SOURCES", DEFAULT_SOURCES).split(",") if s.strip()]
+    bucket = timetable_sync.env_required("R2_BUCKET")
+    api_base_url = timetable_sync.env_required("API_BASE_URL")
+    tokens = TokenProvider(api_base_url, os.getenv("LOGIN_USERNAME", "paulo"))
+
+    # um cache (thread-safe) e um client R2 para todas as fontes
+    cache = R2Cache()
+    jobs = build_jobs(specs, cache, bucket, api_base_url, tokens)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers or len(jobs), thread_name_prefix="sync") as pool:
+        results = list(pool.map(lambda job: run_job(*job), jobs))
+    print_report(results, time.perf_counter() - started)
+
+    if any(r.status == "erro" for r in results):
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
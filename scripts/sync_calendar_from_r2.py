@@ -6,12 +6,15 @@ from __future__ import annotations
 import os
 import json
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional, Tuple
+from fnmatch import fnmatchcase
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import boto3
 import requests
 import openpyxl
 
+from r2_cache import R2Cache, force_sync
+
 try:
     from dotenv import load_dotenv
 except Exception:
@@ -59,67 +62,70 @@ def parse_date_cell(value: Any) -> Optional[date]:
     return None
 
 
-# ----------------------------
-# R2
-# ----------------------------
-
-def r2_client():
-    return boto3.client(
-        "s3",
-        endpoint_url=env_required("R2_ENDPOINT"),
-        aws_access_key_id=env_required("R2_ACCESS_KEY_ID"),
-        aws_secret_access_key=env_required("R2_SECRET_ACCESS_KEY"),
-        region_name="auto",
-    )
-
-
-def download_text_from_r2(bucket: str, key: str) -> str:
-    s3 = r2_client()
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    return obj["Body"].read().decode("utf-8")
-
-
-def download_file_from_r2(bucket: str, key: str, out_path: str) -> None:
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    s3 = r2_client()
-    s3.download_file(bucket, key, out_path)
-    print(f"OK download: {key} -> {out_path}")
-
-
 # ----------------------------
 # Excel
 # ----------------------------
 
-def read_export_sheet(xlsx_path: str, sheet_name: str) -> List[Dict[str, Any]]:
-    wb = openpyxl.load_workbook(xlsx_path, data_only=True)
-
-    if sheet_name not in wb.sheetnames:
-        die(f"Aba '{sheet_name}' não encontrada. Abas: {wb.sheetnames}")
-
-    ws = wb[sheet_name]
-    print(f"Aba selecionada: '{sheet_name}'")
-
-    headers = {}
-    for col in range(1, ws.max_column + 1):
-        v = ws.cell(row=1, column=col).value
-        if v:
-            headers[str(v).strip().lower()] = col
-
-    if "data" not in headers or "letivo" not in headers:
-        die("A aba export precisa ter colunas: data | letivo")
-
-    items: List[Dict[str, Any]] = []
-    for row in range(2, ws.max_row + 1):
-        d = parse_date_cell(ws.cell(row=row, column=headers["data"]).value)
-        if not d:
+def select_sheets(available: List[str], spec: str) -> List[str]:
+    """
+    SHEET_NAME aceita uma aba ("export"), várias separadas por vírgula
+    ("export_2026,export_2027") ou padrão ("export*").
+    """
+    selected: List[str] = []
+    for pattern in (p.strip() for p in spec.split(",")):
+        if not pattern:
             continue
+        matches = [name for name in available if fnmatchcase(name, pattern)]
+        if not matches:
+            die(f"Aba '{pattern}' não encontrada. Abas: {available}")
+        selected += [m for m in matches if m not in selected]
+    return selected
+
+
+def iter_export_rows(xlsx_path: str, sheet_spec: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lê as abas em modo read-only (streaming do XML, uma linha por vez) e
+    devolve os itens já no formato do POST /calendar/import. Cabeçalho
+    resolvido uma vez por aba; memória não cresce com a planilha.
+    """
+    wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in select_sheets(wb.sheetnames, sheet_spec):
+            print(f"Aba selecionada: '{sheet_name}'")
+            rows = wb[sheet_name].iter_rows(values_only=True)
+
+            header = next(rows, None) or ()
+            headers = {str(v).strip().lower(): i for i, v in enumerate(header) if v}
+            if "data" not in headers or "letivo" not in headers:
+                die(f"A aba '{sheet_name}' precisa ter colunas: data | letivo")
+
+            i_data, i_letivo = headers["data"], headers["letivo"]
+            # opcionais: tipo/observacao (observacao leva o SEMESTRE_x usado pelo índice de dias letivos)
+            i_tipo, i_obs = headers.get("tipo"), headers.get("observacao")
+
+            for row in rows:
+                if len(row) <= i_data:
+                    continue
+                d = parse_date_cell(row[i_data])
+                if not d:
+                    continue
+
+                item: Dict[str, Any] = {
+                    "day": d.isoformat(),
+                    "is_school_day": parse_letivo(row[i_letivo] if len(row) > i_letivo else None),
+                }
+                if i_tipo is not None and len(row) > i_tipo and row[i_tipo]:
+                    item["kind"] = str(row[i_tipo]).strip()
+                if i_obs is not None and len(row) > i_obs and row[i_obs]:
+                    item["note"] = str(row[i_obs]).strip()
+                yield item
+    finally:
+        # read-only mantém o arquivo aberto até o close
+        wb.close()
 
-        letivo = ws.cell(row=row, column=headers["letivo"]).value
-        items.append({
-            "day": d.isoformat(),
-            "is_school_day": parse_letivo(letivo),
-        })
 
+def read_export_sheet(xlsx_path: str, sheet_name: str) -> List[Dict[str, Any]]:
+    items = list(iter_export_rows(xlsx_path, sheet_name))
     print(f"Linhas lidas: {len(items)}")
     print("Amostra:")
     print(json.dumps(items[:5], indent=2, ensure_ascii=False))
@@ -145,8 +151,12 @@ def api_login(api_base_url: str, username: str) -> str:
     return token
 
 
-def post_calendar_import(api_base_url: str, token: str, rows: List[Dict[str, Any]]) -> None:
-    batch_size = int(os.getenv("BATCH_SIZE", "50"))
+def post_calendar_import(api_base_url: str, token: str, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Envia em lotes de BATCH_SIZE conforme as linhas chegam (aceita gerador):
+    só um lote fica em memória.
+    """
+    batch_size = int(os.getenv("BATCH_SIZE", "5000"))
     url = api_base_url.rstrip("/") + "/calendar/import"
 
     headers = {
@@ -155,19 +165,33 @@ def post_calendar_import(api_base_url: str, token: str, rows: List[Dict[str, Any
         "accept": "application/json",
     }
 
-    total = len(rows)
-    batches = [rows[i:i + batch_size] for i in range(0, total, batch_size)]
-
-    for i, batch in enumerate(batches, start=1):
-        print(f"→ POST lote {i}/{len(batches)} (itens {len(batch)})")
+    it = iter(rows)
+    total = 0
+    i = 0
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            break
+        i += 1
+        if i == 1:
+            print("Amostra:")
+            print(json.dumps(batch[:5], indent=2, ensure_ascii=False))
+
+        print(f"→ POST lote {i} (itens {len(batch)})")
         resp = requests.post(url, json=batch, headers=headers, timeout=120)
 
         if resp.status_code != 200:
             die(f"Erro no lote {i}: {resp.status_code} - {resp.text}")
 
+        total += len(batch)
         print("API status:", resp.status_code)
 
+    if not total:
+        die("Nenhuma linha válida na planilha (data | letivo)")
+
+    print(f"Linhas enviadas: {total}")
     print("✅ Importação concluída com sucesso (todos os lotes).")
+    return total
 
 
 # ----------------------------
@@ -184,31 +208,45 @@ def main():
     login_username = os.getenv("LOGIN_USERNAME", "paulo")
     sheet_name = os.getenv("SHEET_NAME", "export")
 
-    # 1. Lê index.json
-    index_raw = download_text_from_r2(bucket, index_key)
-    index = json.loads(index_raw)
+    # 1. Lê index.json (GET condicional: 304 se não mudou)
+    cache = R2Cache()
+    index = json.loads(cache.fetch(bucket, index_key).read_bytes().decode("utf-8"))
 
     current_key = index.get("current_key")
     if not current_key:
         die("index.json não possui current_key")
 
-    # 2. Baixa XLSX atual
-    out_path = "tmp/calendar_current.xlsx"
-    download_file_from_r2(bucket, current_key, out_path)
-
-    # 3. Lê planilha
-    rows = read_export_sheet(out_path, sheet_name)
+    # 2. XLSX atual (do cache se o ETag não mudou); já importado = sai sem tocar na API
+    xlsx = cache.fetch(bucket, current_key)
+    print(f"{'OK download' if xlsx.downloaded else 'Sem mudança (ETag)'}: {current_key}")
+    source = f"calendar:{index_key}:{sheet_name}"
+    if cache.is_imported(source, xlsx) and not force_sync() and not os.getenv("LIMIT_DAYS"):
+        print(f"✅ Sem mudanças: {current_key} (sha256 {xlsx.sha256[:12]}) já importado.")
+        return
+    out_path = str(xlsx.path)
+
+    # 3. Lê planilha (streaming: as linhas vão direto para os lotes do POST).
+    #    A primeira linha é lida já aqui: aba/cabeçalho inválido falha antes do login.
+    rows = iter_export_rows(out_path, sheet_name)
+    first = next(rows, None)
+    if first is None:
+        die("Nenhuma linha válida na planilha (data | letivo)")
+    rows = chain([first], rows)
 
     # 4. Limite opcional
     limit = os.getenv("LIMIT_DAYS")
     if limit:
-        rows = rows[:int(limit)]
+        rows = islice(rows, int(limit))
         print(f"LIMIT_DAYS aplicado: {limit}")
 
     # 5. Login + import
     token = api_login(api_base_url, login_username)
     post_calendar_import(api_base_url, token, rows)
 
+    # import parcial (LIMIT_DAYS) não conta como sincronizado
+    if not limit:
+        cache.mark_imported(source, xlsx)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file